@@ -0,0 +1,44 @@
+"""
+JWT 认证
+
+按用户 ID 缓存用户对象，已认证请求不再每次查询用户表。
+用户保存或删除时由信号清除缓存（修改密码、禁用、权限变化都会触发）。
+只在缓存跨进程共享（settings.SHARED_CACHE）时启用：进程内缓存的失效
+清不到其他 worker，被禁用的用户会在其他 worker 上继续通过认证直到 TTL 过期。
+"""
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+# 用户缓存时间（秒）
+AUTH_USER_CACHE_TIMEOUT = 300
+
+
+def auth_user_cache_key(user_id) -> str:
+    """认证用户缓存 key"""
+    return f'auth_user:{user_id}'
+
+
+def invalidate_auth_user(user_id):
+    """清除认证用户缓存（用户变化后调用）"""
+    cache.delete(auth_user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """带用户缓存的 JWT 认证"""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+
+        # 校验密码哈希的吊销检查需要最新用户数据，不走缓存
+        if user_id is None or api_settings.CHECK_REVOKE_TOKEN or not settings.SHARED_CACHE:
+            return super().get_user(validated_token)
+
+        key = auth_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # 用户不存在或已禁用时抛出认证失败，不写缓存
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout=AUTH_USER_CACHE_TIMEOUT)
+        return user
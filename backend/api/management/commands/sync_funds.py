@@ -4,12 +4,17 @@
 从天天基金同步基金列表到数据库
 """
 import logging
+import os
 from django.core.management.base import BaseCommand
 from api.sources import SourceRegistry
 from api.models import Fund
+from api.services.fund_sync import upsert_funds, DEFAULT_BATCH_SIZE
 
 logger = logging.getLogger(__name__)
 
+# 每批 upsert 的行数，可通过环境变量调整
+BATCH_SIZE = int(os.environ.get('SYNC_FUNDS_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+
 
 class Command(BaseCommand):
     help = '从天天基金同步基金列表'
@@ -41,27 +46,7 @@ class Command(BaseCommand):
             funds = source.fetch_fund_list()
             self.stdout.write(f'获取到 {len(funds)} 个基金')
 
-            created_count = 0
-            updated_count = 0
-
-            for fund_data in funds:
-                try:
-                    fund, created = Fund.objects.update_or_create(
-                        fund_code=fund_data['fund_code'],
-                        defaults={
-                            'fund_name': fund_data['fund_name'],
-                            'fund_type': fund_data['fund_type'],
-                        }
-                    )
-
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                except Exception as e:
-                    # 忽略重复键错误，继续处理下一个
-                    logger.warning(f'同步基金 {fund_data["fund_code"]} 失败: {e}')
-                    continue
+            created_count, updated_count = upsert_funds(funds, batch_size=BATCH_SIZE)
 
             self.stdout.write(self.style.SUCCESS(
                 f'同步完成：新增 {created_count} 个，更新 {updated_count} 个'
@@ -4,12 +4,18 @@
 从数据源更新基金的最新净值
 """
 import logging
+import os
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 from api.sources import SourceRegistry
 from api.models import Fund
+from api.services.estimate_cache import invalidate_estimates
 
 logger = logging.getLogger(__name__)
 
+# 每累计多少条净值写一次库（bulk_update 单条 UPDATE 批量提交）
+BATCH_SIZE = int(os.environ.get('UPDATE_NAV_BATCH_SIZE', 1000))
+
 
 class Command(BaseCommand):
     help = '更新基金净值'
@@ -32,7 +38,7 @@ class Command(BaseCommand):
                 return
         else:
             self.stdout.write('开始更新所有基金的净值...')
-            funds = Fund.objects.all()
+            funds = Fund.objects.only('id', 'fund_code')
 
         source = SourceRegistry.get_source('eastmoney')
         if not source:
@@ -41,13 +47,15 @@ class Command(BaseCommand):
 
         success_count = 0
         error_count = 0
+        pending = []
 
-        for fund in funds:
+        for fund in funds.iterator():
             try:
                 data = source.fetch_realtime_nav(fund.fund_code)
                 fund.latest_nav = data['nav']
                 fund.latest_nav_date = data['nav_date']
-                fund.save()
+                fund.updated_at = timezone.now()
+                pending.append(fund)
                 success_count += 1
 
                 if fund_code:
@@ -61,6 +69,20 @@ class Command(BaseCommand):
                 if fund_code:
                     self.stdout.write(self.style.ERROR(f'  更新失败: {e}'))
 
+            if len(pending) >= BATCH_SIZE:
+                self._flush(pending)
+
+        self._flush(pending)
+
         self.stdout.write(self.style.SUCCESS(
             f'更新完成：成功 {success_count} 个，失败 {error_count} 个'
         ))
+
+    @staticmethod
+    def _flush(pending):
+        """批量写入已获取的净值"""
+        if pending:
+            Fund.objects.bulk_update(pending, ['latest_nav', 'latest_nav_date', 'updated_at'])
+            # 估值缓存里带有最新净值，需要失效
+            invalidate_estimates(fund.fund_code for fund in pending)
+            pending.clear()
@@ -0,0 +1,151 @@
+# 持仓、持仓流水、历史净值改用自增 bigint 主键
+#
+# UUID 主键无法原地转换为 bigint，这里新建表 -> 按时间顺序拷贝数据 -> 删除旧表 -> 改回原表名。
+# 旧 UUID 不保留（没有其他表引用这三张表），迁移不可回滚。
+# 新表先不建外键索引，数据拷贝完后由 AlterField / AddIndex 一次建好。
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_rows(table, columns, order_by):
+    cols = ', '.join(columns)
+    return migrations.RunSQL(
+        f'INSERT INTO {table}_new ({cols}) SELECT {cols} FROM {table} ORDER BY {order_by}'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_fundnavhistory'),
+    ]
+
+    operations = [
+        # 持仓
+        migrations.CreateModel(
+            name='PositionNew',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('holding_share', models.DecimalField(decimal_places=4, default=0, max_digits=20)),
+                ('holding_cost', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('holding_nav', models.DecimalField(decimal_places=4, default=0, max_digits=10)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.account')),
+                ('fund', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.fund')),
+            ],
+            options={'db_table': 'position_new'},
+        ),
+        copy_rows(
+            'position',
+            ['account_id', 'fund_id', 'holding_share', 'holding_cost', 'holding_nav', 'updated_at'],
+            'updated_at',
+        ),
+        migrations.DeleteModel(name='Position'),
+        migrations.RenameModel(old_name='PositionNew', new_name='Position'),
+        migrations.AlterModelTable(name='position', table='position'),
+        migrations.AlterModelOptions(
+            name='position',
+            options={'verbose_name': '持仓', 'verbose_name_plural': '持仓'},
+        ),
+        migrations.AlterField(
+            model_name='position',
+            name='account',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='positions', to='api.account'),
+        ),
+        migrations.AlterField(
+            model_name='position',
+            name='fund',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='positions', to='api.fund'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='position',
+            unique_together={('account', 'fund')},
+        ),
+
+        # 持仓流水
+        migrations.CreateModel(
+            name='PositionOperationNew',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('operation_type', models.CharField(choices=[('BUY', '建仓/加仓'), ('SELL', '减仓')], max_length=10)),
+                ('operation_date', models.DateField()),
+                ('before_15', models.BooleanField(default=True, help_text='是否 15:00 前操作')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('share', models.DecimalField(decimal_places=4, max_digits=20)),
+                ('nav', models.DecimalField(decimal_places=4, help_text='操作时的净值', max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.account')),
+                ('fund', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.fund')),
+            ],
+            options={'db_table': 'position_operation_new'},
+        ),
+        copy_rows(
+            'position_operation',
+            ['account_id', 'fund_id', 'operation_type', 'operation_date', 'before_15',
+             'amount', 'share', 'nav', 'created_at'],
+            'operation_date, created_at',
+        ),
+        migrations.DeleteModel(name='PositionOperation'),
+        migrations.RenameModel(old_name='PositionOperationNew', new_name='PositionOperation'),
+        migrations.AlterModelTable(name='positionoperation', table='position_operation'),
+        migrations.AlterModelOptions(
+            name='positionoperation',
+            options={'ordering': ['operation_date', 'created_at'], 'verbose_name': '持仓操作', 'verbose_name_plural': '持仓操作'},
+        ),
+        migrations.AlterField(
+            model_name='positionoperation',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operations', to='api.account'),
+        ),
+        migrations.AlterField(
+            model_name='positionoperation',
+            name='fund',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operations', to='api.fund'),
+        ),
+
+        # 历史净值
+        migrations.CreateModel(
+            name='FundNavHistoryNew',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nav_date', models.DateField(help_text='净值日期')),
+                ('unit_nav', models.DecimalField(decimal_places=4, help_text='单位净值', max_digits=10)),
+                ('accumulated_nav', models.DecimalField(blank=True, decimal_places=4, help_text='累计净值', max_digits=10, null=True)),
+                ('daily_growth', models.DecimalField(blank=True, decimal_places=4, help_text='日增长率（%）', max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fund', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='api.fund')),
+            ],
+            options={'db_table': 'fund_nav_history_new'},
+        ),
+        copy_rows(
+            'fund_nav_history',
+            ['fund_id', 'nav_date', 'unit_nav', 'accumulated_nav', 'daily_growth', 'created_at', 'updated_at'],
+            'nav_date, fund_id',
+        ),
+        migrations.DeleteModel(name='FundNavHistory'),
+        migrations.RenameModel(old_name='FundNavHistoryNew', new_name='FundNavHistory'),
+        migrations.AlterModelTable(name='fundnavhistory', table='fund_nav_history'),
+        migrations.AlterModelOptions(
+            name='fundnavhistory',
+            options={'ordering': ['-nav_date'], 'verbose_name': '基金历史净值', 'verbose_name_plural': '基金历史净值'},
+        ),
+        migrations.AlterField(
+            model_name='fundnavhistory',
+            name='fund',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='nav_history', to='api.fund'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='fundnavhistory',
+            unique_together={('fund', 'nav_date')},
+        ),
+        migrations.AddIndex(
+            model_name='fundnavhistory',
+            index=models.Index(fields=['fund', '-nav_date'], name='fund_nav_hi_fund_id_4957e8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fundnavhistory',
+            index=models.Index(fields=['nav_date'], name='fund_nav_hi_nav_dat_a0d051_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-16 01:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_bigint_pk_hot_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='positionoperation',
+            name='account',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='operations', to='api.account'),
+        ),
+        migrations.AddIndex(
+            model_name='positionoperation',
+            index=models.Index(fields=['account', 'operation_date'], name='posop_acct_date_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-16 01:56
+
+import api.utils.uuid7
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_positionoperation_account_date_idx'),
+    ]
+
+    # default 只在 Python 侧生效，不需要改表结构（SQLite 下 AlterField 会重建整张表）
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='account',
+                    name='id',
+                    field=models.UUIDField(default=api.utils.uuid7.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='estimateaccuracy',
+                    name='id',
+                    field=models.UUIDField(default=api.utils.uuid7.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='fund',
+                    name='id',
+                    field=models.UUIDField(default=api.utils.uuid7.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='watchlist',
+                    name='id',
+                    field=models.UUIDField(default=api.utils.uuid7.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+                migrations.AlterField(
+                    model_name='watchlistitem',
+                    name='id',
+                    field=models.UUIDField(default=api.utils.uuid7.uuid7, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
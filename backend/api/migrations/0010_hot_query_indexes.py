@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-16 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_uuid7_primary_keys'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='estimateaccuracy',
+            name='estimate_ac_fund_id_ea14b0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='estimateaccuracy',
+            name='estimate_ac_source__4ae310_idx',
+        ),
+        migrations.AddIndex(
+            model_name='estimateaccuracy',
+            index=models.Index(condition=models.Q(('error_rate__isnull', False)), fields=['fund', '-estimate_date'], name='acc_fund_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='estimateaccuracy',
+            index=models.Index(condition=models.Q(('error_rate__isnull', False)), fields=['source_name', '-estimate_date'], name='acc_src_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='positionoperation',
+            index=models.Index(fields=['account', 'fund', 'operation_date'], name='posop_acct_fund_date_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-16 02:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='fundnavhistory',
+            name='fund_nav_hi_fund_id_4957e8_idx',
+        ),
+    ]
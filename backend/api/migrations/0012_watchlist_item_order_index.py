@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-16 02:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_drop_redundant_nav_history_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='watchlistitem',
+            name='watchlist',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='api.watchlist'),
+        ),
+        migrations.AddIndex(
+            model_name='watchlistitem',
+            index=models.Index(fields=['watchlist', 'order'], name='wl_item_order_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-16 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_watchlist_item_order_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fund',
+            name='estimate_fetched_at',
+            field=models.DateTimeField(blank=True, help_text='估值获取时间（判断数据库估值是否过期）', null=True),
+        ),
+    ]
@@ -1,14 +1,15 @@
-import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .utils.uuid7 import uuid7
+
 User = get_user_model()
 
 
 class Fund(models.Model):
     """基金模型"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     fund_code = models.CharField(max_length=10, unique=True, db_index=True)
     fund_name = models.CharField(max_length=100)
     fund_type = models.CharField(max_length=50, null=True, blank=True)
@@ -39,6 +40,10 @@ class Fund(models.Model):
         null=True, blank=True,
         help_text='估值更新时间'
     )
+    estimate_fetched_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text='估值获取时间（判断数据库估值是否过期）'
+    )
 
     # 元数据
     created_at = models.DateTimeField(auto_now_add=True)
@@ -56,7 +61,7 @@ class Fund(models.Model):
 class Account(models.Model):
     """账户模型"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='accounts')
     name = models.CharField(max_length=100)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='children')
@@ -121,7 +126,7 @@ class Account(models.Model):
     def holding_cost(self):
         """持仓成本"""
         from decimal import Decimal
-        if self.parent is None:
+        if self.parent_id is None:
             # 父账户：汇总所有子账户
             return sum(
                 (child.holding_cost for child in self.children.all()),
@@ -138,7 +143,7 @@ class Account(models.Model):
     def holding_value(self):
         """持仓市值（latest_nav）"""
         from decimal import Decimal
-        if self.parent is None:
+        if self.parent_id is None:
             # 父账户：汇总所有子账户
             return sum(
                 (child.holding_value for child in self.children.all()),
@@ -170,7 +175,7 @@ class Account(models.Model):
     def estimate_value(self):
         """预估市值"""
         from decimal import Decimal
-        if self.parent is None:
+        if self.parent_id is None:
             # 父账户：汇总所有子账户
             values = [child.estimate_value for child in self.children.all()]
             if None in values:
@@ -205,7 +210,7 @@ class Account(models.Model):
     def today_pnl(self):
         """今日盈亏"""
         from decimal import Decimal
-        if self.parent is None:
+        if self.parent_id is None:
             # 父账户：汇总所有子账户
             values = [child.today_pnl for child in self.children.all()]
             if None in values:
@@ -232,8 +237,8 @@ class Account(models.Model):
 class Position(models.Model):
     """持仓汇总模型（只读，由流水计算）"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='positions')
+    # (account, fund) 唯一索引已覆盖按账户查询
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='positions', db_index=False)
     fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='positions')
 
     # 汇总数据（只读，由流水计算）
@@ -281,8 +286,8 @@ class PositionOperation(models.Model):
         ('SELL', '减仓'),
     ]
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='operations')
+    # (account, operation_date) 索引已覆盖按账户查询
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='operations', db_index=False)
     fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='operations')
 
     operation_type = models.CharField(max_length=10, choices=OPERATION_TYPE_CHOICES)
@@ -300,6 +305,12 @@ class PositionOperation(models.Model):
         verbose_name = '持仓操作'
         verbose_name_plural = '持仓操作'
         ordering = ['operation_date', 'created_at']
+        indexes = [
+            # 持仓历史回放：account_id = ? AND operation_date <= ? ORDER BY operation_date
+            models.Index(fields=['account', 'operation_date'], name='posop_acct_date_idx'),
+            # 重算单个持仓：account_id = ? AND fund_id = ? ORDER BY operation_date
+            models.Index(fields=['account', 'fund', 'operation_date'], name='posop_acct_fund_date_idx'),
+        ]
 
     def __str__(self):
         return f'{self.get_operation_type_display()} - {self.fund.fund_name} - {self.operation_date}'
@@ -327,7 +338,7 @@ class PositionOperation(models.Model):
 class Watchlist(models.Model):
     """自选列表"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='watchlists')
     name = models.CharField(max_length=100)
 
@@ -346,8 +357,9 @@ class Watchlist(models.Model):
 class WatchlistItem(models.Model):
     """自选列表项"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    watchlist = models.ForeignKey(Watchlist, on_delete=models.CASCADE, related_name='items')
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    # (watchlist, fund) 唯一索引和 (watchlist, order) 索引都以 watchlist 开头，不再单独建外键索引
+    watchlist = models.ForeignKey(Watchlist, on_delete=models.CASCADE, related_name='items', db_index=False)
     fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='watchlist_items')
     order = models.IntegerField(default=0, help_text='排序')
 
@@ -359,6 +371,10 @@ class WatchlistItem(models.Model):
         verbose_name_plural = '自选项'
         unique_together = [['watchlist', 'fund']]
         ordering = ['order']
+        indexes = [
+            # 按列表取项并按 order 排序、添加时取最大 order
+            models.Index(fields=['watchlist', 'order'], name='wl_item_order_idx'),
+        ]
 
     def __str__(self):
         return f'{self.watchlist.name} - {self.fund.fund_name}'
@@ -367,7 +383,7 @@ class WatchlistItem(models.Model):
 class EstimateAccuracy(models.Model):
     """估值准确率记录"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     source_name = models.CharField(max_length=50, db_index=True)
     fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='accuracy_records')
 
@@ -385,8 +401,17 @@ class EstimateAccuracy(models.Model):
         verbose_name_plural = '估值准确率'
         unique_together = [['source_name', 'fund', 'estimate_date']]
         indexes = [
-            models.Index(fields=['fund', 'estimate_date']),
-            models.Index(fields=['source_name', 'estimate_date']),
+            # 准确率统计只看已计算的记录，按日期倒序取最近 N 条
+            models.Index(
+                fields=['fund', '-estimate_date'],
+                condition=models.Q(error_rate__isnull=False),
+                name='acc_fund_date_idx',
+            ),
+            models.Index(
+                fields=['source_name', '-estimate_date'],
+                condition=models.Q(error_rate__isnull=False),
+                name='acc_src_date_idx',
+            ),
         ]
 
     def __str__(self):
@@ -403,8 +428,8 @@ class EstimateAccuracy(models.Model):
 class FundNavHistory(models.Model):
     """基金历史净值"""
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='nav_history')
+    # (fund, nav_date) 唯一索引已覆盖按基金查询
+    fund = models.ForeignKey(Fund, on_delete=models.CASCADE, related_name='nav_history', db_index=False)
 
     # 净值数据
     nav_date = models.DateField(help_text='净值日期')
@@ -431,10 +456,10 @@ class FundNavHistory(models.Model):
         db_table = 'fund_nav_history'
         verbose_name = '基金历史净值'
         verbose_name_plural = '基金历史净值'
+        # (fund, nav_date) 唯一索引同时服务按基金倒序查询，不再单独建 (fund, -nav_date) 索引
         unique_together = [['fund', 'nav_date']]
         ordering = ['-nav_date']
         indexes = [
-            models.Index(fields=['fund', '-nav_date']),
             models.Index(fields=['nav_date']),
         ]
 
@@ -443,7 +468,7 @@ class FundNavHistory(models.Model):
 
 
 # Signal handlers
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -452,3 +477,48 @@ def recalculate_position_on_delete(sender, instance, **kwargs):
     """删除操作后自动重算持仓"""
     from .services import recalculate_position
     recalculate_position(instance.account.id, instance.fund.id)
+
+
+@receiver(post_save, sender=Fund)
+def invalidate_fund_count_on_create(sender, instance, created, **kwargs):
+    """新增基金后清除基金总数缓存"""
+    if created:
+        from .services.fund_sync import invalidate_fund_count
+        invalidate_fund_count()
+
+
+@receiver(post_delete, sender=Fund)
+def invalidate_fund_count_on_delete(sender, instance, **kwargs):
+    """删除基金后清除基金总数缓存"""
+    from .services.fund_sync import invalidate_fund_count
+    invalidate_fund_count()
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_user_summary_on_account_change(sender, instance, **kwargs):
+    """账户变化后清除用户资产汇总缓存"""
+    from .services.summary_cache import invalidate_user_summary
+    invalidate_user_summary(instance.user_id)
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def invalidate_user_summary_on_position_change(sender, instance, **kwargs):
+    """持仓变化后清除用户资产汇总缓存"""
+    from .services.summary_cache import invalidate_user_summary
+    # 重算服务取持仓时已带出账户，不再额外查询
+    if Position.account.is_cached(instance):
+        user_id = instance.account.user_id
+    else:
+        user_id = Account.objects.filter(pk=instance.account_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        invalidate_user_summary(user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user_on_change(sender, instance, **kwargs):
+    """用户变化后清除认证用户缓存"""
+    from .authentication import invalidate_auth_user
+    invalidate_auth_user(instance.pk)
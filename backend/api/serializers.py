@@ -27,13 +27,27 @@ class FundSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class FundMiniSerializer(serializers.ModelSerializer):
+    """基金净值/估值信息（嵌套在持仓中，只读）"""
+
+    class Meta:
+        model = Fund
+        fields = [
+            'fund_code', 'fund_name', 'fund_type',
+            'latest_nav', 'latest_nav_date',
+            'estimate_nav', 'estimate_growth', 'estimate_time',
+        ]
+        read_only_fields = fields
+
+
 class AccountSerializer(serializers.ModelSerializer):
     """账户序列化器"""
 
     parent = serializers.PrimaryKeyRelatedField(
         queryset=Account.objects.all(),
         required=False,
-        allow_null=True
+        allow_null=True,
+        pk_field=serializers.UUIDField(format='hex_verbose')
     )
 
     # 汇总字段
@@ -64,19 +78,17 @@ class AccountSerializer(serializers.ModelSerializer):
 
     def get_children(self, obj):
         """获取子账户列表（仅父账户）"""
-        if obj.parent is not None:
+        if obj.parent_id is not None:
             return None
         children = obj.children.all()
         return AccountSerializer(children, many=True, context=self.context).data
 
     def to_representation(self, instance):
-        """序列化时将 UUID 转为字符串，移除子账户的 children 字段"""
+        """序列化时移除子账户的 children 字段（parent 由 pk_field 输出为字符串）"""
         data = super().to_representation(instance)
-        if data.get('parent'):
-            data['parent'] = str(data['parent'])
 
         # 子账户不返回 children 字段
-        if instance.parent is not None:
+        if instance.parent_id is not None:
             data.pop('children', None)
 
         return data
@@ -107,20 +119,7 @@ class PositionSerializer(serializers.ModelSerializer):
     pnl = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
 
     # 添加基金的估值和净值信息
-    fund = serializers.SerializerMethodField()
-
-    def get_fund(self, obj):
-        """返回基金的详细信息"""
-        return {
-            'fund_code': obj.fund.fund_code,
-            'fund_name': obj.fund.fund_name,
-            'fund_type': obj.fund.fund_type,
-            'latest_nav': str(obj.fund.latest_nav) if obj.fund.latest_nav else None,
-            'latest_nav_date': obj.fund.latest_nav_date.isoformat() if obj.fund.latest_nav_date else None,
-            'estimate_nav': str(obj.fund.estimate_nav) if obj.fund.estimate_nav else None,
-            'estimate_growth': str(obj.fund.estimate_growth) if obj.fund.estimate_growth else None,
-            'estimate_time': obj.fund.estimate_time.isoformat() if obj.fund.estimate_time else None,
-        }
+    fund = FundMiniSerializer(read_only=True)
 
     class Meta:
         model = Position
@@ -165,17 +164,6 @@ class PositionOperationSerializer(serializers.ModelSerializer):
 
         return data
 
-    def create(self, validated_data):
-        """创建操作并自动重算持仓"""
-        from .services import recalculate_position
-
-        operation = super().create(validated_data)
-
-        # 自动重算持仓
-        recalculate_position(operation.account.id, operation.fund.id)
-
-        return operation
-
 
 class WatchlistItemSerializer(serializers.ModelSerializer):
     """自选列表项序列化器"""
@@ -62,8 +62,9 @@ def recalculate_position(account_id, fund_id) -> Position:
         holding_nav = Decimal('0')
 
     # 更新或创建 Position（使用对象而不是 ID）
+    # 连带取出账户，保存信号清除汇总缓存时无需再查账户
     with transaction.atomic():
-        position, created = Position.objects.update_or_create(
+        position, created = Position.objects.select_related('account').update_or_create(
             account=account,
             fund=fund,
             defaults={
@@ -0,0 +1,26 @@
+"""
+基金估值缓存
+
+batch_estimate 和 estimate 共用，key 为 estimate:{fund_code}。
+缓存内容是 batch_estimate 单个基金的返回（含基金名称和最新净值），命中时不查数据库，
+因此更新最新净值后需要调用 invalidate_estimates。
+"""
+from typing import Iterable
+from django.core.cache import cache
+
+
+def estimate_cache_key(fund_code: str) -> str:
+    """基金估值缓存 key"""
+    return f'estimate:{fund_code}'
+
+
+def estimate_inflight_key(fund_code: str) -> str:
+    """基金估值获取锁 key"""
+    return f'inflight:estimate:{fund_code}'
+
+
+def invalidate_estimates(fund_codes: Iterable[str]):
+    """清除基金估值缓存（最新净值变化后调用）"""
+    keys = [estimate_cache_key(code) for code in fund_codes]
+    if keys:
+        cache.delete_many(keys)
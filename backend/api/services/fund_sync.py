@@ -0,0 +1,73 @@
+"""
+基金列表同步服务
+"""
+from itertools import batched
+from typing import Dict, List, Tuple
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import Fund
+
+# 每批 upsert 的行数
+DEFAULT_BATCH_SIZE = 10000
+
+# 基金总数缓存（未过滤的基金列表分页用，仅 settings.SHARED_CACHE 时启用）
+FUND_COUNT_CACHE_KEY = 'fund_count'
+FUND_COUNT_CACHE_TIMEOUT = 3600
+
+
+def invalidate_fund_count():
+    """基金新增或删除后清除基金总数缓存"""
+    cache.delete(FUND_COUNT_CACHE_KEY)
+
+
+def upsert_funds(funds: List[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[int, int]:
+    """
+    批量写入基金列表（按 fund_code 新增或更新名称、类型）
+
+    每批一条 INSERT ... ON CONFLICT DO UPDATE，整体在一个事务内提交
+
+    Args:
+        funds: 数据源返回的基金列表 [{'fund_code', 'fund_name', 'fund_type'}, ...]
+        batch_size: 每批行数
+
+    Returns:
+        (新增数, 更新数)
+    """
+    # 按基金代码去重（同一批次内 ON CONFLICT 不能重复更新同一行）
+    fund_map = {f['fund_code']: f for f in funds}
+
+    created_count = 0
+    updated_count = 0
+
+    with transaction.atomic():
+        # 逐批构造 Fund 实例，内存中只保留当前批次
+        for batch in batched(fund_map.values(), batch_size):
+            codes = [f['fund_code'] for f in batch]
+            existing = set(
+                Fund.objects.filter(fund_code__in=codes)
+                .values_list('fund_code', flat=True)
+            )
+
+            Fund.objects.bulk_create(
+                [
+                    Fund(
+                        fund_code=f['fund_code'],
+                        fund_name=f['fund_name'],
+                        fund_type=f['fund_type'],
+                    )
+                    for f in batch
+                ],
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=['fund_code'],
+                update_fields=['fund_name', 'fund_type', 'updated_at'],
+            )
+
+            updated_count += len(existing)
+            created_count += len(batch) - len(existing)
+
+    if created_count:
+        invalidate_fund_count()
+
+    return created_count, updated_count
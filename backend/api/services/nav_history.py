@@ -53,10 +53,42 @@ def sync_nav_history(
         return 0
 
     # 批量导入
-    count = 0
+    count = sum(created for _, created in _save_nav_history(fund, nav_data))
+
+    logger.info(f'同步历史净值完成：{fund_code}，新增 {count} 条记录')
+    return count
+
+
+def sync_nav_on_date(fund: Fund, nav_date: date) -> Optional[FundNavHistory]:
+    """
+    同步基金单日净值
+
+    Args:
+        fund: 基金
+        nav_date: 净值日期
+
+    Returns:
+        该日的历史净值记录，数据源没有该日数据时返回 None
+    """
+    source = SourceRegistry.get_source('eastmoney')
+    nav_data = source.fetch_nav_history(fund.fund_code, nav_date, nav_date)
+
+    if not nav_data:
+        return None
+
+    # 直接返回写入的记录，调用方不必再查一次
+    for record, _ in _save_nav_history(fund, nav_data):
+        if record.nav_date == nav_date:
+            return record
+    return None
+
+
+def _save_nav_history(fund: Fund, nav_data: List[dict]) -> list:
+    """写入历史净值，返回 [(记录, 是否新增)]"""
+    saved = []
     with transaction.atomic():
         for item in nav_data:
-            _, created = FundNavHistory.objects.update_or_create(
+            saved.append(FundNavHistory.objects.update_or_create(
                 fund=fund,
                 nav_date=item['nav_date'],
                 defaults={
@@ -64,12 +96,8 @@ def sync_nav_history(
                     'accumulated_nav': item.get('accumulated_nav'),
                     'daily_growth': item.get('daily_growth'),
                 }
-            )
-            if created:
-                count += 1
-
-    logger.info(f'同步历史净值完成：{fund_code}，新增 {count} 条记录')
-    return count
+            ))
+    return saved
 
 
 def batch_sync_nav_history(
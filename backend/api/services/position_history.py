@@ -7,9 +7,16 @@
 3. 计算每日市值 = Σ(份额 × 净值)
 """
 from datetime import date, timedelta
-from decimal import Decimal
 from typing import Dict, List, Set
-from ..models import PositionOperation, FundNavHistory, Fund
+from uuid import UUID
+from ..models import PositionOperation, FundNavHistory
+
+# 回放使用定点整数：份额 × 10^4（4 位小数），金额以分为单位（2 位小数）
+SHARE_SCALE = 10000
+COST_SCALE = 100
+
+# 前向填充净值时向前多查的天数（覆盖春节等长假）
+NAV_LOOKBACK_DAYS = 15
 
 
 def calculate_account_history(account_id: str, days: int = 30) -> List[Dict]:
@@ -30,23 +37,30 @@ def calculate_account_history(account_id: str, days: int = 30) -> List[Dict]:
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
 
-    # 1. 获取所有操作流水（包括查询范围之前的操作）
-    operations = PositionOperation.objects.filter(
+    # 1. 获取所有操作流水（包括查询范围之前的操作，只取回放需要的列，一次查询取回）
+    operations = list(PositionOperation.objects.filter(
         account_id=account_id,
         operation_date__lte=end_date
-    ).select_related('fund').order_by('operation_date')
+    ).select_related('fund').only(
+        'fund_id', 'operation_type', 'operation_date', 'share', 'amount',
+        'fund__latest_nav',
+    ).order_by('operation_date'))
 
-    if not operations.exists():
+    if not operations:
         return []
 
     # 2. 回放流水，计算每日持仓
     daily_positions = _replay_operations(operations, start_date, end_date)
 
-    # 3. 获取所有基金 ID
+    # 3. 获取所有基金 ID，以及 Fund.latest_nav（已随流水 JOIN 取回，无需再查 Fund 表）
     fund_ids = set(daily_positions.keys())
+    fund_latest_nav = {
+        op.fund_id: op.fund.latest_nav
+        for op in operations if op.fund.latest_nav
+    }
 
     # 4. 查询每日净值
-    daily_nav = _get_daily_nav(fund_ids, start_date, end_date)
+    daily_nav = _get_daily_nav(fund_ids, fund_latest_nav, start_date, end_date)
 
     # 5. 计算每日市值
     result = _calculate_daily_value(daily_positions, daily_nav, start_date, end_date)
@@ -54,59 +68,61 @@ def calculate_account_history(account_id: str, days: int = 30) -> List[Dict]:
     return result
 
 
+def _div_round_half_even(num: int, den: int) -> int:
+    """整数除法，按银行家舍入（与 Decimal.quantize 默认舍入一致），den > 0"""
+    q, r = divmod(num, den)
+    if 2 * r > den or (2 * r == den and q % 2):
+        q += 1
+    return q
+
+
 def _replay_operations(operations, start_date, end_date):
     """
     回放流水，计算每日持仓
 
-    返回: {
-        fund_id: {
-            date(2026, 2, 1): {'share': Decimal('100'), 'cost': Decimal('1000')},
-            date(2026, 2, 2): {'share': Decimal('150'), 'cost': Decimal('1500')},
-        }
-    }
+    份额和成本以定点整数累计（份额 × SHARE_SCALE，成本 × COST_SCALE），
+    卖出后成本舍入到分，与 Position 汇总逻辑一致
+
+    返回: {fund_id: (shares, costs)}，见 _fill_dates
     """
-    # 当前持仓状态 {fund_id: {'share': Decimal, 'cost': Decimal}}
+    # 当前持仓状态 {fund_id: [share, cost]}
     current_positions = {}
 
-    # 每日持仓快照 {fund_id: {date: {'share': Decimal, 'cost': Decimal}}}
+    # 每日持仓快照 {fund_id: {date: {'share': int, 'cost': int}}}
     daily_positions = {}
 
     # 回放所有操作
     for op in operations:
-        fund_id = str(op.fund_id)
+        fund_id = op.fund_id
+        op_share = int(op.share * SHARE_SCALE)
 
         # 初始化基金持仓
-        if fund_id not in current_positions:
-            current_positions[fund_id] = {
-                'share': Decimal('0'),
-                'cost': Decimal('0')
-            }
+        current = current_positions.get(fund_id)
+        if current is None:
+            current = current_positions[fund_id] = [0, 0]
+            daily_positions[fund_id] = {}
+
+        share, cost = current
 
         # 更新持仓
         if op.operation_type == 'BUY':
             # 买入：增加份额和成本
-            current_positions[fund_id]['share'] += op.share
-            current_positions[fund_id]['cost'] += op.amount
+            share += op_share
+            cost += int(op.amount * COST_SCALE)
         else:  # SELL
             # 卖出：按每份成本计算，与 Position 汇总逻辑一致
-            if current_positions[fund_id]['share'] > 0:
-                # 计算每份成本
-                cost_per_share = current_positions[fund_id]['cost'] / current_positions[fund_id]['share']
-                # 减少份额
-                current_positions[fund_id]['share'] -= op.share
-                # 减少成本（卖出份额 × 每份成本）
-                current_positions[fund_id]['cost'] -= op.share * cost_per_share
-            else:
-                # 如果没有持仓，只减少份额（可能出现负数）
-                current_positions[fund_id]['share'] -= op.share
+            if share > 0:
+                # 剩余成本 = 成本 × (1 - 卖出份额 / 持有份额)，舍入到分
+                cost = _div_round_half_even(cost * (share - op_share), share)
+            # 如果没有持仓，只减少份额（可能出现负数）
+            share -= op_share
 
-        # 记录当日持仓（只记录操作日期的持仓）
-        if fund_id not in daily_positions:
-            daily_positions[fund_id] = {}
+        current[0], current[1] = share, cost
 
+        # 记录当日持仓（只记录操作日期的持仓）
         daily_positions[fund_id][op.operation_date] = {
-            'share': current_positions[fund_id]['share'],
-            'cost': current_positions[fund_id]['cost']
+            'share': share,
+            'cost': cost
         }
 
     # 填充日期：为每个基金填充查询范围内的所有日期
@@ -115,89 +131,88 @@ def _replay_operations(operations, start_date, end_date):
 
 def _fill_dates(daily_positions, start_date, end_date):
     """
-    填充日期：为每个基金填充查询范围内的所有日期
+    填充日期：为每个基金生成按天下标（距 start_date 的天数）的稠密持仓数组
 
     逻辑：
     - 如果某日有操作，使用操作后的持仓
     - 如果某日无操作，使用最近一次操作后的持仓
     - 如果该日之前没有任何操作，持仓为 0
+
+    返回: {fund_id: (shares, costs)}，两个长度为天数的 float 列表
     """
+    days = (end_date - start_date).days + 1
     filled_positions = {}
 
     for fund_id, positions in daily_positions.items():
-        filled_positions[fund_id] = {}
-
-        # 获取所有操作日期（排序）
-        operation_dates = sorted(positions.keys())
-
-        # 遍历查询范围内的每一天
-        current_date = start_date
-        while current_date <= end_date:
-            # 找到当日或之前最近的一次操作
-            latest_position = None
-            for op_date in operation_dates:
-                if op_date <= current_date:
-                    latest_position = positions[op_date]
-                else:
-                    break
-
-            # 如果找到了操作，使用该持仓；否则持仓为 0
-            if latest_position:
-                filled_positions[fund_id][current_date] = latest_position
-            else:
-                filled_positions[fund_id][current_date] = {
-                    'share': Decimal('0'),
-                    'cost': Decimal('0')
-                }
-
-            current_date += timedelta(days=1)
+        shares = [0.0] * days
+        costs = [0.0] * days
+
+        # 按操作日期顺序前向填充：每个变化点覆盖到下一个变化点之前
+        share = cost = 0.0
+        filled = 0
+        for operation_date in sorted(positions):
+            offset = (operation_date - start_date).days
+            if offset > filled:
+                shares[filled:offset] = [share] * (offset - filled)
+                costs[filled:offset] = [cost] * (offset - filled)
+                filled = offset
+            share = positions[operation_date]['share'] / SHARE_SCALE
+            cost = positions[operation_date]['cost'] / COST_SCALE
+
+        shares[filled:] = [share] * (days - filled)
+        costs[filled:] = [cost] * (days - filled)
+        filled_positions[fund_id] = (shares, costs)
 
     return filled_positions
 
 
-def _get_daily_nav(fund_ids: Set[str], start_date, end_date):
+def _get_daily_nav(fund_ids: Set[UUID], fund_latest_nav: Dict, start_date, end_date):
     """
     查询每日净值
 
-    返回: {
-        fund_id: {
-            date(2026, 2, 1): Decimal('1.2345'),
-            date(2026, 2, 2): Decimal('1.2400'),
-        }
-    }
+    非交易日（周末、节假日）没有净值，沿用此前最近一个净值（前向填充），
+    查询时向前多取 NAV_LOOKBACK_DAYS 天作为区间首日的起点；
+    此前完全没有净值的日期使用 fund_latest_nav 作为 fallback
+
+    返回: {fund_id: [1.2345, 1.24, 1.24, ...]}，按天下标，缺失为 None
     """
-    # 查询历史净值
+    days = (end_date - start_date).days + 1
+
+    # 查询历史净值（只取需要的列，不 JOIN Fund、不实例化模型，分块流式读取不缓存结果集）
     nav_records = FundNavHistory.objects.filter(
         fund_id__in=fund_ids,
-        nav_date__gte=start_date,
-        nav_date__lte=end_date
-    ).select_related('fund')
-
-    # 组织成字典
-    daily_nav = {}
-    for record in nav_records:
-        fund_id = str(record.fund_id)
-        if fund_id not in daily_nav:
-            daily_nav[fund_id] = {}
-        daily_nav[fund_id][record.nav_date] = record.unit_nav
-
-    # 查询 Fund.latest_nav 作为 fallback
-    funds = Fund.objects.filter(id__in=fund_ids)
-    fund_latest_nav = {str(f.id): f.latest_nav for f in funds if f.latest_nav}
-
-    # 填充缺失的净值（使用 latest_nav）
-    for fund_id in fund_ids:
-        if fund_id not in daily_nav:
-            daily_nav[fund_id] = {}
-
-        # 为每个日期填充净值（如果缺失，使用 latest_nav）
-        if fund_id in fund_latest_nav:
-            current_date = start_date
-            while current_date <= end_date:
-                # 如果当日没有历史净值，使用 latest_nav
-                if current_date not in daily_nav[fund_id]:
-                    daily_nav[fund_id][current_date] = fund_latest_nav[fund_id]
-                current_date += timedelta(days=1)
+        nav_date__range=(start_date - timedelta(days=NAV_LOOKBACK_DAYS), end_date)
+    ).order_by('nav_date').values_list(
+        'fund_id', 'nav_date', 'unit_nav'
+    ).iterator(chunk_size=5000)
+
+    # 组织成按天下标的数组，区间之前的净值只记录为填充起点
+    daily_nav = {fund_id: [None] * days for fund_id in fund_ids}
+    seed_nav = {}
+    for fund_id, nav_date, unit_nav in nav_records:
+        offset = (nav_date - start_date).days
+        if offset < 0:
+            seed_nav[fund_id] = float(unit_nav)
+        else:
+            daily_nav[fund_id][offset] = float(unit_nav)
+
+    for fund_id, navs in daily_nav.items():
+        # 前向填充：缺失的日期沿用最近一个净值
+        last_nav = seed_nav.get(fund_id)
+        for i in range(days):
+            if navs[i] is None:
+                navs[i] = last_nav
+            else:
+                last_nav = navs[i]
+
+        # 仍然缺失的日期（此前没有任何净值）使用 latest_nav
+        latest_nav = fund_latest_nav.get(fund_id)
+        if latest_nav is not None:
+            latest_nav = float(latest_nav)
+            for i in range(days):
+                if navs[i] is not None:
+                    break
+                navs[i] = latest_nav
 
     return daily_nav
 
@@ -206,47 +221,44 @@ def _calculate_daily_value(daily_positions, daily_nav, start_date, end_date):
     """
     计算每日市值
 
+    持仓与净值均为按天下标的稠密数组，按基金逐列累加到每日合计（float 运算）
+
     返回: [
         {'date': '2026-02-01', 'value': 10000.00, 'cost': 9500.00},
         {'date': '2026-02-02', 'value': 10200.00, 'cost': 9500.00},
     ]
     """
-    result = []
-    current_date = start_date
-
-    while current_date <= end_date:
-        total_value = Decimal('0')
-        total_cost = Decimal('0')
-
-        # 遍历所有基金
-        for fund_id, positions in daily_positions.items():
-            # 获取当日持仓
-            position = positions.get(current_date)
-            if not position or position['share'] == 0:
+    dates = [
+        start_date + timedelta(days=i)
+        for i in range((end_date - start_date).days + 1)
+    ]
+    total_values = [0.0] * len(dates)
+    total_costs = [0.0] * len(dates)
+    no_nav = [None] * len(dates)
+
+    # 遍历所有基金
+    for fund_id, (shares, costs) in daily_positions.items():
+        navs = daily_nav.get(fund_id, no_nav)
+
+        for i, share in enumerate(shares):
+            if share == 0:
                 continue
 
+            cost = costs[i]
+
             # 成本始终计入
-            total_cost += position['cost']
+            total_costs[i] += cost
 
-            # 获取当日净值
-            nav = daily_nav.get(fund_id, {}).get(current_date)
+            nav = navs[i]
             if nav:
                 # 如果有净值，计算市值
-                total_value += position['share'] * nav
-            else:
+                total_values[i] += share * nav
+            elif share > 0:
                 # 如果没有净值，使用持仓净值估算市值
-                # 持仓净值 = 成本 / 份额
-                if position['share'] > 0:
-                    holding_nav = position['cost'] / position['share']
-                    total_value += position['share'] * holding_nav
+                # 份额 × (成本 / 份额) = 成本
+                total_values[i] += cost
 
-        # 添加到结果
-        result.append({
-            'date': current_date.isoformat(),
-            'value': float(total_value),
-            'cost': float(total_cost)
-        })
-
-        current_date += timedelta(days=1)
-
-    return result
+    return [
+        {'date': d.isoformat(), 'value': value, 'cost': cost}
+        for d, value, cost in zip(dates, total_values, total_costs)
+    ]
@@ -0,0 +1,21 @@
+"""
+用户资产汇总缓存
+
+UserViewSet.summary 使用，key 为 user_summary:{user_id}。
+账户、持仓变化时由信号清除；基金最新净值变化不逐用户清除，靠短 TTL 兜底。
+只在缓存跨进程共享（settings.SHARED_CACHE）时启用：进程内缓存的失效清不到其他 worker。
+"""
+from django.core.cache import cache
+
+# 汇总缓存时间（秒）
+USER_SUMMARY_CACHE_TIMEOUT = 60
+
+
+def user_summary_cache_key(user_id) -> str:
+    """用户资产汇总缓存 key"""
+    return f'user_summary:{user_id}'
+
+
+def invalidate_user_summary(user_id):
+    """清除用户资产汇总缓存（账户或持仓变化后调用）"""
+    cache.delete(user_summary_cache_key(user_id))
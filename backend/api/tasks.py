@@ -24,3 +24,44 @@ def update_fund_nav():
     except Exception as e:
         logger.error(f'基金净值更新失败: {str(e)}')
         raise
+
+
+@shared_task(ignore_result=True)
+def persist_estimates(estimates):
+    """
+    批量写入基金估值
+
+    batch_estimate 获取到估值后投递，一条 UPDATE 写回所有基金
+
+    Args:
+        estimates: [{'fund_code', 'estimate_nav', 'estimate_growth', 'estimate_time',
+                     'estimate_fetched_at'}, ...]
+            数值为字符串，时间为 ISO 格式；estimate_time 为数据源报价时间，estimate_fetched_at 为获取时间
+    """
+    from decimal import Decimal
+    from datetime import datetime
+    from .models import Fund
+
+    funds = Fund.objects.in_bulk(
+        [e['fund_code'] for e in estimates], field_name='fund_code'
+    )
+
+    to_update = []
+    for e in estimates:
+        fund = funds.get(e['fund_code'])
+        if not fund:
+            continue
+        fund.estimate_nav = Decimal(e['estimate_nav']) if e['estimate_nav'] is not None else None
+        fund.estimate_growth = Decimal(e['estimate_growth']) if e['estimate_growth'] is not None else None
+        fund.estimate_time = datetime.fromisoformat(e['estimate_time'])
+        # 升级前投递的任务没有获取时间
+        if e.get('estimate_fetched_at'):
+            fund.estimate_fetched_at = datetime.fromisoformat(e['estimate_fetched_at'])
+        to_update.append(fund)
+
+    Fund.objects.bulk_update(
+        to_update,
+        ['estimate_nav', 'estimate_growth', 'estimate_time', 'estimate_fetched_at'],
+        batch_size=500,
+    )
+    return len(to_update)
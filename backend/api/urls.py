@@ -31,7 +31,7 @@ urlpatterns = [
         'get': 'list',
         'post': 'create'
     })),
-    path('positions/operations/<uuid:pk>/', viewsets.PositionOperationViewSet.as_view({
+    path('positions/operations/<int:pk>/', viewsets.PositionOperationViewSet.as_view({
         'get': 'retrieve',
         'delete': 'destroy'
     })),
@@ -6,6 +6,23 @@
 from datetime import date, timedelta
 import chinese_calendar as calendar
 
+# 按年缓存的交易日集合 {year: frozenset[date]}，首次用到某年时构建
+_TRADING_DAYS: dict[int, frozenset] = {}
+
+
+def _trading_days_of_year(year: int) -> frozenset:
+    """获取某年的全部交易日（带缓存）"""
+    days = _TRADING_DAYS.get(year)
+    if days is None:
+        start = date(year, 1, 1)
+        total = (date(year + 1, 1, 1) - start).days
+        days = frozenset(
+            d for d in (start + timedelta(days=i) for i in range(total))
+            if calendar.is_workday(d)
+        )
+        _TRADING_DAYS[year] = days
+    return days
+
 
 def is_trading_day(d: date) -> bool:
     """
@@ -23,8 +40,8 @@ def is_trading_day(d: date) -> bool:
         bool: True 表示是交易日，False 表示不是
     """
     # 使用 chinese_calendar 判断是否是工作日
-    # is_workday() 会考虑节假日和调休
-    return calendar.is_workday(d)
+    # is_workday() 会考虑节假日和调休，结果按年预计算为集合
+    return d in _trading_days_of_year(d.year)
 
 
 def get_last_trading_day(d: date) -> date:
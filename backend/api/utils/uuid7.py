@@ -0,0 +1,20 @@
+"""
+UUIDv7 生成
+
+按 RFC 9562：前 48 位为毫秒时间戳，其余为随机数。
+新主键按时间递增，B-tree 索引插入集中在末尾页，避免 uuid4 的随机写入。
+"""
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """生成 UUIDv7"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+
+    # 版本号 7（bits 76-79）和 RFC 4122 变体（bits 62-63）
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
@@ -7,9 +7,20 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Sum
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Q, F, Sum, Avg, Max, Count, Value, Subquery, Prefetch, DecimalField
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+import logging
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from decimal import Decimal
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
@@ -18,14 +29,110 @@ from .models import (
     Watchlist, WatchlistItem, EstimateAccuracy, FundNavHistory
 )
 from .serializers import (
-    FundSerializer, AccountSerializer, PositionSerializer,
+    FundSerializer, FundMiniSerializer, AccountSerializer, PositionSerializer,
     PositionOperationSerializer, WatchlistSerializer, UserRegisterSerializer,
     FundNavHistorySerializer, QueryNavSerializer
 )
 from .sources import SourceRegistry
 from .services import recalculate_all_positions
+from .services.fund_sync import upsert_funds, FUND_COUNT_CACHE_KEY, FUND_COUNT_CACHE_TIMEOUT
+from .services.estimate_cache import (
+    estimate_cache_key, estimate_inflight_key, invalidate_estimates
+)
+from .services.summary_cache import user_summary_cache_key, USER_SUMMARY_CACHE_TIMEOUT
+from .tasks import persist_estimates
 from fundval.config import config
 
+logger = logging.getLogger(__name__)
+
+
+# 访问数据源的共享线程数
+ESTIMATE_FETCH_WORKERS = 20
+# 估值获取锁的过期时间（秒），防止持锁请求异常退出后一直占用
+ESTIMATE_INFLIGHT_TIMEOUT = 10
+# 等待其他请求获取估值的最长时间（秒）及轮询间隔
+ESTIMATE_WAIT_TIMEOUT = 5
+ESTIMATE_WAIT_INTERVAL = 0.05
+# 数据源估值时间为北京时间（不带时区）
+ESTIMATE_SOURCE_TZ = ZoneInfo('Asia/Shanghai')
+
+# 进程内共享的数据源线程池，避免每个请求重复创建和销毁线程
+_FETCH_POOL = ThreadPoolExecutor(
+    max_workers=ESTIMATE_FETCH_WORKERS, thread_name_prefix='fund-fetch'
+)
+
+
+def _wait_for_estimates(fund_codes):
+    """
+    等待其他请求把估值写入缓存
+
+    持锁请求先写缓存再释放锁，锁已释放仍无缓存说明其获取失败，不再等待。
+
+    Returns:
+        dict: {fund_code: 缓存内容}，获取失败或超时的基金不在其中
+    """
+    estimates = {}
+    pending = list(fund_codes)
+    deadline = time.monotonic() + ESTIMATE_WAIT_TIMEOUT
+
+    while pending and time.monotonic() < deadline:
+        time.sleep(ESTIMATE_WAIT_INTERVAL)
+        cached = cache.get_many(
+            [estimate_cache_key(code) for code in pending]
+            + [estimate_inflight_key(code) for code in pending]
+        )
+        for code in pending:
+            if estimate_cache_key(code) in cached:
+                estimates[code] = cached[estimate_cache_key(code)]
+        pending = [
+            code for code in pending
+            if code not in estimates and estimate_inflight_key(code) in cached
+        ]
+
+    return estimates
+
+
+def _str_or_none(value):
+    return str(value) if value is not None else None
+
+
+def _estimate_time(data):
+    """数据源的估值时间（带时区），数据源未给出时取当前时间"""
+    value = data.get('estimate_time')
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if not isinstance(value, datetime):
+        return timezone.now()
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, ESTIMATE_SOURCE_TZ)
+    return value
+
+
+def _estimate_fields(data):
+    """数据源返回的估值 -> 返回中的估值字段（估值时间为数据源的估值时间）"""
+    return {
+        'estimate_nav': _str_or_none(data.get('estimate_nav')),
+        'estimate_growth': _str_or_none(data.get('estimate_growth')),
+        'estimate_time': _estimate_time(data).isoformat(),
+    }
+
+
+# estimate 接口返回的字段，缓存命中与否返回一致
+ESTIMATE_RESPONSE_FIELDS = (
+    'fund_code', 'fund_name', 'estimate_nav', 'estimate_growth', 'estimate_time',
+)
+
+
+def _estimate_entry(fund, estimate):
+    """组装 batch_estimate 单个基金的返回（不含 from_cache），也是估值缓存的内容"""
+    return {
+        'fund_code': fund.fund_code,
+        'fund_name': fund.fund_name,
+        **estimate,
+        'latest_nav': str(fund.latest_nav) if fund.latest_nav else None,
+        'latest_nav_date': fund.latest_nav_date.isoformat() if fund.latest_nav_date else None,
+    }
+
 
 class FundViewSet(viewsets.ReadOnlyModelViewSet):
     """基金 ViewSet"""
@@ -48,14 +155,46 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
     def list(self, request, *args, **kwargs):
-        """基金列表（分页）"""
-        queryset = self.filter_queryset(self.get_queryset()).order_by('fund_code')
+        """
+        基金列表（分页）
+
+        默认按 page 分页并返回 count；
+        传 after=<fund_code> 时按基金代码游标分页，不做 COUNT/OFFSET，返回 next 游标
+        """
+        # 只取序列化器用到的列，按字典返回，不实例化模型
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *FundSerializer.Meta.fields
+        ).order_by('fund_code')
 
         page_size = int(request.query_params.get('page_size', 20))
 
+        after = request.query_params.get('after')
+        if after is not None:
+            # 多取一条判断是否还有下一页
+            funds = list(queryset.filter(fund_code__gt=after)[:page_size + 1])
+            has_next = len(funds) > page_size
+            funds = funds[:page_size]
+
+            serializer = self.get_serializer(funds, many=True)
+            return Response({
+                'next': funds[-1]['fund_code'] if has_next else None,
+                'results': serializer.data
+            })
+
         # 手动分页
         from django.core.paginator import Paginator
         paginator = Paginator(queryset, page_size)
+
+        # 未搜索、未过滤时总数就是基金总数，走缓存，避免每次 COUNT(*) 全表
+        # 同步任务在其他进程清除缓存，进程内缓存清不到，不共享时不缓存
+        if (
+            settings.SHARED_CACHE
+            and not request.query_params.get('search')
+            and not request.query_params.get('fund_type')
+        ):
+            paginator.count = cache.get_or_set(
+                FUND_COUNT_CACHE_KEY, queryset.count, timeout=FUND_COUNT_CACHE_TIMEOUT
+            )
         page_number = int(request.query_params.get('page', 1))
         page = paginator.get_page(page_number)
 
@@ -68,9 +207,17 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['get'])
     def estimate(self, request, fund_code=None):
         """获取基金估值"""
-        fund = self.get_object()
         source_name = request.query_params.get('source', 'eastmoney')
 
+        # 默认数据源与 batch_estimate 共用估值缓存，命中时不查库
+        use_cache = source_name == 'eastmoney'
+        if use_cache:
+            entry = cache.get(estimate_cache_key(fund_code))
+            if entry is not None:
+                return Response({key: entry[key] for key in ESTIMATE_RESPONSE_FIELDS})
+
+        fund = self.get_object()
+
         source = SourceRegistry.get_source(source_name)
         if not source:
             return Response(
@@ -80,7 +227,16 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
 
         try:
             data = source.fetch_estimate(fund_code)
-            return Response(data)
+            if not data:
+                return Response(data)
+
+            entry = _estimate_entry(fund, _estimate_fields(data))
+            if use_cache:
+                cache.set(
+                    estimate_cache_key(fund_code), entry,
+                    timeout=config.get('estimate_cache_ttl', 5) * 60
+                )
+            return Response({key: entry[key] for key in ESTIMATE_RESPONSE_FIELDS})
         except Exception as e:
             return Response(
                 {'error': str(e)},
@@ -93,40 +249,28 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
         fund = self.get_object()
         days = int(request.query_params.get('days', 100))
 
-        # 获取最近 N 天的准确率记录
-        records = EstimateAccuracy.objects.filter(
+        # 最近 N 条准确率记录，一次查询取出后在内存中按数据源分组
+        # 同一日期各数据源各有一条，按数据源排序保证截断位置确定
+        window = EstimateAccuracy.objects.filter(
             fund=fund,
             error_rate__isnull=False
-        ).order_by('-estimate_date')[:days]
+        ).order_by('-estimate_date', 'source_name')[:days]
 
-        # 按数据源分组统计
         result = {}
-        for record in records:
-            source_name = record.source_name
-            if source_name not in result:
-                result[source_name] = {
-                    'records': [],
-                    'total_error': Decimal('0'),
-                    'count': 0
-                }
-
-            result[source_name]['records'].append({
-                'date': record.estimate_date,
-                'error_rate': record.error_rate
+        for source_name, estimate_date, error_rate in window.values_list(
+            'source_name', 'estimate_date', 'error_rate'
+        ):
+            data = result.setdefault(source_name, {'records': []})
+            data['records'].append({
+                'date': estimate_date,
+                'error_rate': error_rate
             })
-            result[source_name]['total_error'] += record.error_rate
-            result[source_name]['count'] += 1
 
-        # 计算平均误差率
-        for source_name, data in result.items():
-            if data['count'] > 0:
-                data['avg_error_rate'] = data['total_error'] / data['count']
-            else:
-                data['avg_error_rate'] = Decimal('0')
-
-            data['record_count'] = data['count']
-            del data['total_error']
-            del data['count']
+        # 计算平均误差率和记录数
+        for data in result.values():
+            count = len(data['records'])
+            data['avg_error_rate'] = sum(r['error_rate'] for r in data['records']) / count
+            data['record_count'] = count
 
         return Response(result)
 
@@ -160,34 +304,44 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
         if not fund_codes:
             return Response({'error': '缺少 fund_codes 参数'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 查询数据库
-        funds = Fund.objects.filter(fund_code__in=fund_codes)
-        fund_map = {f.fund_code: f for f in funds}
-
         results = {}
-        need_fetch = []  # 需要从数据源获取的基金
 
-        # 检查缓存
-        now = timezone.now()
+        # 先查估值缓存，命中的基金不再查数据库
+        cached = cache.get_many([estimate_cache_key(code) for code in fund_codes])
         for code in fund_codes:
+            entry = cached.get(estimate_cache_key(code))
+            if entry is not None:
+                results[code] = {**entry, 'from_cache': True}
+
+        # 未命中的基金查数据库（只取组装返回用到的列）
+        missing = [code for code in fund_codes if code not in results]
+        fund_map = Fund.objects.only(
+            'fund_code', 'fund_name', 'latest_nav', 'latest_nav_date',
+            'estimate_nav', 'estimate_growth', 'estimate_time', 'estimate_fetched_at',
+        ).in_bulk(missing, field_name='fund_code') if missing else {}
+
+        need_fetch = []  # 需要从数据源获取的基金
+
+        # 数据库中未过期的估值仍可用（获取时间晚于 threshold）
+        # 估值时间是数据源报价时间，收盘后始终早于 threshold，不能用来判断过期
+        threshold = timezone.now() - timedelta(minutes=ttl_minutes)
+        for code in missing:
             fund = fund_map.get(code)
             if not fund:
                 results[code] = {'error': '基金不存在'}
                 continue
 
-            # 检查缓存是否有效
-            if (fund.estimate_nav and fund.estimate_time and
-                (now - fund.estimate_time).total_seconds() < ttl_minutes * 60):
-                # 缓存命中
+            if (
+                fund.estimate_nav and fund.estimate_time
+                and fund.estimate_fetched_at and fund.estimate_fetched_at > threshold
+            ):
                 results[code] = {
-                    'fund_code': code,
-                    'fund_name': fund.fund_name,
-                    'estimate_nav': str(fund.estimate_nav),
-                    'estimate_growth': str(fund.estimate_growth) if fund.estimate_growth else None,
-                    'estimate_time': fund.estimate_time.isoformat(),
-                    'latest_nav': str(fund.latest_nav) if fund.latest_nav else None,
-                    'latest_nav_date': fund.latest_nav_date.isoformat() if fund.latest_nav_date else None,
-                    'from_cache': True
+                    **_estimate_entry(fund, {
+                        'estimate_nav': str(fund.estimate_nav),
+                        'estimate_growth': str(fund.estimate_growth) if fund.estimate_growth else None,
+                        'estimate_time': fund.estimate_time.isoformat(),
+                    }),
+                    'from_cache': True,
                 }
             else:
                 # 缓存失效，需要重新获取
@@ -195,43 +349,79 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
 
         # 从数据源获取
         if need_fetch:
+            # 同一基金同时只由一个请求访问数据源，其余请求等待其写入缓存
+            owned = [
+                code for code in need_fetch
+                if cache.add(estimate_inflight_key(code), '1', timeout=ESTIMATE_INFLIGHT_TIMEOUT)
+            ]
+            waiting = [code for code in need_fetch if code not in owned]
+
+            # 数据源每个请求只查一次
             source = SourceRegistry.get_source('eastmoney')
 
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {executor.submit(source.fetch_estimate, code): code
-                          for code in need_fetch}
-
-                for future in as_completed(futures):
-                    code = futures[future]
-                    try:
-                        data = future.result()
-                        fund = fund_map.get(code)
-
-                        if fund and data:
-                            # 更新数据库
-                            fund.estimate_nav = data.get('estimate_nav')
-                            fund.estimate_growth = data.get('estimate_growth')
-                            fund.estimate_time = timezone.now()
-                            fund.save(update_fields=['estimate_nav', 'estimate_growth', 'estimate_time'])
-
-                            results[code] = {
-                                'fund_code': code,
-                                'fund_name': fund.fund_name,
-                                'estimate_nav': str(data.get('estimate_nav')),
-                                'estimate_growth': str(data.get('estimate_growth')),
-                                'estimate_time': fund.estimate_time.isoformat(),
-                                'latest_nav': str(fund.latest_nav) if fund.latest_nav else None,
-                                'latest_nav_date': fund.latest_nav_date.isoformat() if fund.latest_nav_date else None,
-                                'from_cache': False
-                            }
-                    except Exception as e:
-                        results[code] = {
-                            'fund_code': code,
-                            'error': f'获取估值失败: {str(e)}'
-                        }
+            try:
+                self._fetch_estimates(source, owned, fund_map, results, ttl_minutes)
+            finally:
+                cache.delete_many([estimate_inflight_key(code) for code in owned])
+
+            if waiting:
+                estimates = _wait_for_estimates(waiting)
+                for code, entry in estimates.items():
+                    results[code] = {**entry, 'from_cache': True}
+
+                # 等待超时的基金自行获取
+                self._fetch_estimates(
+                    source, [code for code in waiting if code not in estimates],
+                    fund_map, results, ttl_minutes
+                )
 
         return Response(results)
 
+    def _fetch_estimates(self, source, fund_codes, fund_map, results, ttl_minutes):
+        """并发从数据源获取估值，写入缓存并批量持久化"""
+        if not fund_codes:
+            return
+
+        to_persist = []
+        fresh = {}
+        # 估值时间是数据源的报价时间，收盘后不再变化，是否过期按获取时间判断
+        fetched_at = timezone.now().isoformat()
+
+        futures = {_FETCH_POOL.submit(source.fetch_estimate, code): code
+                   for code in fund_codes}
+
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                data = future.result()
+                fund = fund_map.get(code)
+
+                if fund and data:
+                    estimate = _estimate_fields(data)
+                    to_persist.append({
+                        'fund_code': code, **estimate, 'estimate_fetched_at': fetched_at,
+                    })
+
+                    entry = _estimate_entry(fund, estimate)
+                    fresh[estimate_cache_key(code)] = entry
+                    results[code] = {**entry, 'from_cache': False}
+            except Exception as e:
+                results[code] = {
+                    'fund_code': code,
+                    'error': f'获取估值失败: {str(e)}'
+                }
+
+        cache.set_many(fresh, timeout=ttl_minutes * 60)
+
+        # 估值以缓存为准，写库只用于持久化，交给 Celery 异步批量写入
+        if to_persist:
+            try:
+                persist_estimates.apply_async(args=[to_persist], retry=False)
+            except Exception as e:
+                # broker 不可用时退回同步写入
+                logger.warning(f'估值持久化任务投递失败，改为同步写入: {e}')
+                persist_estimates(to_persist)
+
     @action(detail=False, methods=['post'], permission_classes=[AllowAny])
     def batch_update_nav(self, request):
         """
@@ -258,39 +448,46 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({'error': '缺少 fund_codes 参数'}, status=status.HTTP_400_BAD_REQUEST)
 
         # 查询数据库
-        funds = Fund.objects.filter(fund_code__in=fund_codes)
-        fund_map = {f.fund_code: f for f in funds}
+        fund_map = Fund.objects.in_bulk(fund_codes, field_name='fund_code')
 
         results = {}
+        to_update = []
         source = SourceRegistry.get_source('eastmoney')
 
         # 并发获取净值
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = {executor.submit(source.fetch_realtime_nav, code): code
-                      for code in fund_codes if code in fund_map}
-
-            for future in as_completed(futures):
-                code = futures[future]
-                try:
-                    data = future.result()
-                    fund = fund_map.get(code)
-
-                    if fund and data:
-                        # 更新数据库
-                        fund.latest_nav = data.get('nav')
-                        fund.latest_nav_date = data.get('nav_date')
-                        fund.save(update_fields=['latest_nav', 'latest_nav_date'])
-
-                        results[code] = {
-                            'fund_code': code,
-                            'latest_nav': str(data.get('nav')),
-                            'latest_nav_date': data.get('nav_date').isoformat() if data.get('nav_date') else None,
-                        }
-                except Exception as e:
+        futures = {_FETCH_POOL.submit(source.fetch_realtime_nav, code): code
+                   for code in fund_codes if code in fund_map}
+
+        for future in as_completed(futures):
+            code = futures[future]
+            try:
+                data = future.result()
+                fund = fund_map.get(code)
+
+                if fund and data:
+                    # 只更新内存对象，全部获取完后统一写库
+                    fund.latest_nav = data.get('nav')
+                    fund.latest_nav_date = data.get('nav_date')
+                    # bulk_update 不触发 auto_now，手动更新（历史市值缓存 key 依赖 updated_at）
+                    fund.updated_at = timezone.now()
+                    to_update.append(fund)
+
                     results[code] = {
                         'fund_code': code,
-                        'error': f'获取净值失败: {str(e)}'
+                        'latest_nav': str(data.get('nav')),
+                        'latest_nav_date': data.get('nav_date').isoformat() if data.get('nav_date') else None,
                     }
+            except Exception as e:
+                results[code] = {
+                    'fund_code': code,
+                    'error': f'获取净值失败: {str(e)}'
+                }
+
+        # 一条 UPDATE 批量写回净值，估值缓存里的最新净值随之失效
+        Fund.objects.bulk_update(
+            to_update, ['latest_nav', 'latest_nav_date', 'updated_at'], batch_size=500,
+        )
+        invalidate_estimates(fund.fund_code for fund in to_update)
 
         return Response(results)
 
@@ -315,7 +512,6 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
             "source": "history"  // 或 "latest"
         }
         """
-        from datetime import timedelta
         from .utils.trading_calendar import get_last_trading_day
 
         serializer = QueryNavSerializer(data=request.data)
@@ -350,21 +546,12 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
             })
 
         # 4. 如果没有历史净值，尝试从数据源同步
-        from .services.nav_history import sync_nav_history
-        import logging
-
-        logger = logging.getLogger(__name__)
+        from .services.nav_history import sync_nav_on_date
 
         try:
             logger.info(f'尝试同步 {fund_code} 在 {query_date} 的净值')
-            count = sync_nav_history(fund_code, query_date, query_date)
-            logger.info(f'同步完成，新增/更新 {count} 条记录')
-
-            # 再次查询
-            nav_history = FundNavHistory.objects.filter(
-                fund=fund,
-                nav_date=query_date
-            ).first()
+            # 同步直接返回该日记录，不再查询一次
+            nav_history = sync_nav_on_date(fund, query_date)
 
             if nav_history:
                 logger.info(f'同步后查询成功：{fund_code} {query_date} = {nav_history.unit_nav}')
@@ -409,22 +596,8 @@ class FundViewSet(viewsets.ReadOnlyModelViewSet):
         try:
             funds = source.fetch_fund_list()
 
-            created_count = 0
-            updated_count = 0
-
-            for fund_data in funds:
-                fund, created = Fund.objects.update_or_create(
-                    fund_code=fund_data['fund_code'],
-                    defaults={
-                        'fund_name': fund_data['fund_name'],
-                        'fund_type': fund_data['fund_type'],
-                    }
-                )
-
-                if created:
-                    created_count += 1
-                else:
-                    updated_count += 1
+            # 批量 upsert，整个同步在一个事务内完成
+            created_count, updated_count = upsert_funds(funds)
 
             return Response({
                 'created': created_count,
@@ -449,13 +622,21 @@ class AccountViewSet(viewsets.ModelViewSet):
         """只返回当前用户的账户（优化查询）"""
         queryset = Account.objects.filter(user=self.request.user)
 
+        # 删除账户和持仓列表不渲染汇总字段，无需预取
+        if self.action in ('destroy', 'positions'):
+            return queryset
+
+        # 汇总字段只用到持仓份额、成本和基金净值/估值
+        positions = Position.objects.select_related('fund').only(
+            'id', 'account_id', 'fund_id', 'holding_share', 'holding_cost',
+            'fund__latest_nav', 'fund__estimate_nav',
+        )
+
         # 优化：预加载子账户和持仓数据
         queryset = queryset.prefetch_related(
             'children',  # 预加载子账户
-            'children__positions',  # 预加载子账户的持仓
-            'children__positions__fund',  # 预加载持仓的基金
-            'positions',  # 预加载自己的持仓
-            'positions__fund',  # 预加载持仓的基金
+            Prefetch('children__positions', queryset=positions),  # 预加载子账户的持仓及基金
+            Prefetch('positions', queryset=positions),  # 预加载自己的持仓及基金
         )
 
         return queryset
@@ -468,7 +649,7 @@ class AccountViewSet(viewsets.ModelViewSet):
     def positions(self, request, pk=None):
         """获取账户的所有持仓"""
         account = self.get_object()
-        positions = Position.objects.filter(account=account).select_related('fund')
+        positions = Position.objects.filter(account=account).select_related('fund', 'account')
         serializer = PositionSerializer(positions, many=True)
         return Response(serializer.data)
 
@@ -481,7 +662,9 @@ class PositionViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         """只返回当前用户的持仓"""
-        queryset = Position.objects.filter(account__user=self.request.user)
+        queryset = Position.objects.filter(
+            account__user=self.request.user
+        ).select_related('fund', 'account')
 
         # 按账户过滤
         account_id = self.request.query_params.get('account')
@@ -497,7 +680,13 @@ class PositionViewSet(viewsets.ReadOnlyModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """持仓列表（不分页）"""
-        queryset = self.filter_queryset(self.get_queryset())
+        # 只取序列化用到的列，关联的账户只需要名称
+        queryset = self.filter_queryset(self.get_queryset()).only(
+            'id', 'account_id', 'fund_id',
+            'holding_share', 'holding_cost', 'holding_nav', 'updated_at',
+            'account__name',
+            *(f'fund__{field}' for field in FundMiniSerializer.Meta.fields),
+        )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -522,7 +711,8 @@ class PositionViewSet(viewsets.ReadOnlyModelViewSet):
             ...
         ]
         """
-        from .services.position_history import calculate_account_history
+        from datetime import date, timedelta
+        from .services.position_history import calculate_account_history, NAV_LOOKBACK_DAYS
 
         account_id = request.query_params.get('account_id')
         days = int(request.query_params.get('days', 30))
@@ -543,8 +733,27 @@ class PositionViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 计算历史市值
-        result = calculate_account_history(account_id, days)
+        # 计算历史市值（带缓存）
+        # 缓存 key 包含流水、基金净值的最新变更，数据变化后 key 随之变化，旧结果自然失效
+        op_stats = PositionOperation.objects.filter(account_id=account.id).aggregate(
+            last_created=Max('created_at'),
+            count=Count('id'),
+            last_fund_updated=Max('fund__updated_at'),
+        )
+        last_nav_updated = FundNavHistory.objects.filter(
+            fund_id__in=PositionOperation.objects.filter(account_id=account.id).values('fund_id'),
+            nav_date__gte=date.today() - timedelta(days=days + NAV_LOOKBACK_DAYS),
+        ).aggregate(last=Max('updated_at'))['last']
+
+        versions = [op_stats['last_created'], op_stats['last_fund_updated'], last_nav_updated]
+        cache_key = 'account_history:{}:{}:{}:{}:{}'.format(
+            account.id, days, date.today().isoformat(), op_stats['count'],
+            ':'.join(f'{v.timestamp():.6f}' if v else '0' for v in versions),
+        )
+        result = cache.get(cache_key)
+        if result is None:
+            result = calculate_account_history(account.id, days)
+            cache.set(cache_key, result, timeout=24 * 3600)
 
         return Response(result)
 
@@ -568,6 +777,9 @@ class PositionOperationViewSet(viewsets.ModelViewSet):
         else:
             queryset = PositionOperation.objects.filter(account__user=self.request.user)
 
+        # 序列化需要 fund_name、account_name，一次 JOIN 取回
+        queryset = queryset.select_related('fund', 'account')
+
         # 按账户过滤
         account_id = self.request.query_params.get('account')
         if account_id:
@@ -582,7 +794,13 @@ class PositionOperationViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         """操作流水列表（不分页）"""
-        queryset = self.filter_queryset(self.get_queryset())
+        # 只取序列化用到的列，关联的基金和账户只需要名称
+        queryset = self.filter_queryset(self.get_queryset()).only(
+            'id', 'account_id', 'fund_id',
+            'operation_type', 'operation_date', 'before_15',
+            'amount', 'share', 'nav', 'created_at',
+            'fund__fund_name', 'account__name',
+        )
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -595,7 +813,21 @@ class WatchlistViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """只返回当前用户的自选列表"""
-        return Watchlist.objects.filter(user=self.request.user)
+        queryset = Watchlist.objects.filter(user=self.request.user)
+
+        # 增删、排序列表项和删除列表不返回列表项，无需预取
+        if self.action in ('items', 'remove_item', 'reorder', 'destroy'):
+            return queryset
+
+        return queryset.prefetch_related(
+            Prefetch(
+                'items',
+                queryset=WatchlistItem.objects.select_related('fund').only(
+                    'id', 'watchlist_id', 'fund_id', 'order', 'created_at',
+                    'fund__fund_code', 'fund__fund_name', 'fund__fund_type',
+                ),
+            )
+        )
 
     def perform_create(self, serializer):
         """创建自选列表时自动设置用户"""
@@ -621,25 +853,25 @@ class WatchlistViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 检查是否已存在
-        if WatchlistItem.objects.filter(watchlist=watchlist, fund=fund).exists():
+        # order = 当前最大 order + 1，在 INSERT 语句内由数据库计算，省一次查询且无并发竞争
+        max_order = WatchlistItem.objects.filter(watchlist=watchlist).values(
+            'watchlist'
+        ).annotate(max_order=Max('order')).values('max_order')
+
+        # 重复添加由 (watchlist, fund) 唯一约束拦截，不再先查一次是否存在
+        try:
+            with transaction.atomic():
+                item = WatchlistItem.objects.create(
+                    watchlist=watchlist,
+                    fund=fund,
+                    order=Coalesce(Subquery(max_order), Value(-1)) + 1
+                )
+        except IntegrityError:
             return Response(
                 {'error': '基金已在自选列表中'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 获取最大 order
-        from django.db.models import Max
-        max_order = WatchlistItem.objects.filter(watchlist=watchlist).aggregate(
-            max_order=Max('order')
-        )['max_order'] or -1
-
-        item = WatchlistItem.objects.create(
-            watchlist=watchlist,
-            fund=fund,
-            order=max_order + 1
-        )
-
         return Response(
             {'id': item.id, 'fund_code': fund.fund_code},
             status=status.HTTP_201_CREATED
@@ -680,16 +912,19 @@ class WatchlistViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 更新排序
+        # 一次查出相关列表项，按新顺序批量更新（不存在的基金代码忽略）
+        items = {
+            item.fund.fund_code: item
+            for item in WatchlistItem.objects.filter(
+                watchlist=watchlist,
+                fund__fund_code__in=fund_codes
+            ).select_related('fund').only('id', 'order', 'fund__fund_code')
+        }
         for index, fund_code in enumerate(fund_codes):
-            try:
-                fund = Fund.objects.get(fund_code=fund_code)
-                WatchlistItem.objects.filter(
-                    watchlist=watchlist,
-                    fund=fund
-                ).update(order=index)
-            except Fund.DoesNotExist:
-                pass
+            if fund_code in items:
+                items[fund_code].order = index
+
+        WatchlistItem.objects.bulk_update(items.values(), ['order'])
 
         return Response({'message': '排序已更新'})
 
@@ -710,24 +945,18 @@ class SourceViewSet(viewsets.ViewSet):
         source_name = pk
         days = int(request.query_params.get('days', 100))
 
-        # 获取最近 N 天的准确率记录（按记录数量，不按日期）
-        records = EstimateAccuracy.objects.filter(
+        # 最近 N 条记录（按记录数量，不按日期）的平均误差率，由数据库聚合
+        totals = EstimateAccuracy.objects.filter(
             source_name=source_name,
             error_rate__isnull=False
-        ).order_by('-estimate_date')[:days]
-
-        if not records.exists():
-            return Response({
-                'avg_error_rate': 0,
-                'record_count': 0
-            })
-
-        total_error = sum(r.error_rate for r in records)
-        count = len(records)
+        ).order_by('-estimate_date')[:days].aggregate(
+            avg_error_rate=Avg('error_rate'),
+            record_count=Count('id'),
+        )
 
         return Response({
-            'avg_error_rate': total_error / count if count > 0 else 0,
-            'record_count': count
+            'avg_error_rate': totals['avg_error_rate'] or 0,
+            'record_count': totals['record_count']
         })
 
 
@@ -768,31 +997,38 @@ class UserViewSet(viewsets.ViewSet):
         """获取用户资产汇总"""
         user = request.user
 
-        # 统计账户数
-        account_count = Account.objects.filter(user=user).count()
-
-        # 统计持仓数和总成本
-        positions = Position.objects.filter(account__user=user)
-        position_count = positions.count()
-        total_cost = sum(p.holding_cost for p in positions)
-
-        # 计算总市值和总盈亏
-        total_value = Decimal('0')
-        total_pnl = Decimal('0')
-
-        for position in positions:
-            if position.fund.latest_nav:
-                value = position.fund.latest_nav * position.holding_share
-                total_value += value
-                total_pnl += position.pnl
+        # 进程内缓存的失效清不到其他 worker，不共享时不缓存
+        cache_key = user_summary_cache_key(user.id)
+        totals = cache.get(cache_key) if settings.SHARED_CACHE else None
+        if totals is not None:
+            return Response(totals)
+
+        # 账户数、持仓数、总成本、总市值、总盈亏在数据库中一次聚合
+        # 账户 LEFT JOIN 持仓，每个持仓只出现一次；市值和盈亏只统计有最新净值的基金
+        has_nav = Q(positions__fund__latest_nav__gt=0)
+        nav = F('positions__fund__latest_nav')
+        share = F('positions__holding_share')
+        amount_field = DecimalField(max_digits=30, decimal_places=8)
+        totals = Account.objects.filter(user=user).aggregate(
+            account_count=Count('id', distinct=True),
+            position_count=Count('positions'),
+            total_cost=Coalesce(
+                Sum('positions__holding_cost'),
+                Decimal('0'), output_field=DecimalField(max_digits=20, decimal_places=2),
+            ),
+            total_value=Coalesce(
+                Sum(nav * share, filter=has_nav, output_field=amount_field),
+                Decimal('0'), output_field=amount_field,
+            ),
+            total_pnl=Coalesce(
+                Sum((nav - F('positions__holding_nav')) * share, filter=has_nav, output_field=amount_field),
+                Decimal('0'), output_field=amount_field,
+            ),
+        )
+        if settings.SHARED_CACHE:
+            cache.set(cache_key, totals, timeout=USER_SUMMARY_CACHE_TIMEOUT)
 
-        return Response({
-            'account_count': account_count,
-            'position_count': position_count,
-            'total_cost': total_cost,
-            'total_value': total_value,
-            'total_pnl': total_pnl,
-        })
+        return Response(totals)
 
 
 class FundNavHistoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -845,22 +1081,24 @@ class FundNavHistoryViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        results = {}
-        for fund_code in fund_codes:
-            queryset = FundNavHistory.objects.filter(fund__fund_code=fund_code)
+        # 所有基金一次查询，再按基金代码分组
+        queryset = FundNavHistory.objects.filter(
+            fund__fund_code__in=fund_codes
+        ).select_related('fund')
 
-            # 单日查询
-            if nav_date:
-                queryset = queryset.filter(nav_date=nav_date)
-            else:
-                # 时间段查询
-                if start_date:
-                    queryset = queryset.filter(nav_date__gte=start_date)
-                if end_date:
-                    queryset = queryset.filter(nav_date__lte=end_date)
-
-            serializer = self.get_serializer(queryset, many=True)
-            results[fund_code] = serializer.data
+        # 单日查询
+        if nav_date:
+            queryset = queryset.filter(nav_date=nav_date)
+        else:
+            # 时间段查询
+            if start_date:
+                queryset = queryset.filter(nav_date__gte=start_date)
+            if end_date:
+                queryset = queryset.filter(nav_date__lte=end_date)
+
+        results = {fund_code: [] for fund_code in fund_codes}
+        for item in self.get_serializer(queryset, many=True).data:
+            results[item['fund_code']].append(item)
 
         return Response(results)
 
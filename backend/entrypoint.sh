@@ -12,10 +12,14 @@ while ! pg_isready -h db -U $POSTGRES_USER > /dev/null 2>&1; do
 done
 echo "✓ Database ready"
 
-# 运行数据库迁移
+# 运行数据库迁移（已是最新时跳过，省去 post_migrate 的权限/内容类型检查）
 echo "Running migrations..."
-python manage.py migrate --noinput
-echo "✓ Migrations complete"
+if python manage.py migrate --check > /dev/null 2>&1; then
+    echo "✓ Migrations up to date"
+else
+    python manage.py migrate --noinput
+    echo "✓ Migrations complete"
+fi
 
 # 收集静态文件
 echo "Collecting static files..."
@@ -80,6 +80,9 @@ WSGI_APPLICATION = 'fundval.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# 持久连接：请求之间复用数据库连接（秒），避免每个请求重新建连和执行初始化 PRAGMA
+CONN_MAX_AGE = int(os.environ.get('CONN_MAX_AGE', 60))
+
 db_type = config.get('db_type', 'sqlite')
 if db_type == 'postgresql':
     db_config = config.get('db_config', {})
@@ -91,6 +94,8 @@ if db_type == 'postgresql':
             'PASSWORD': os.environ.get('POSTGRES_PASSWORD', db_config.get('password', 'fundval')),
             'HOST': os.environ.get('POSTGRES_HOST', db_config.get('host', 'localhost')),
             'PORT': os.environ.get('POSTGRES_PORT', db_config.get('port', 5432)),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 else:
@@ -98,6 +103,47 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'OPTIONS': {
+                # WAL 模式下读写互不阻塞，多个 worker 的读请求不用等写事务；
+                # WAL 下 synchronous=NORMAL 不会损坏数据库，提交时少一次 fsync；
+                # 加大页缓存（约 20MB）、临时表放内存、读走 mmap
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                    'PRAGMA mmap_size=268435456;'
+                ),
+                # 写事务开始即加写锁，避免读事务升级为写时直接报 database is locked
+                'transaction_mode': 'IMMEDIATE',
+                # 等待写锁的最长时间（秒）
+                'timeout': 20,
+                # ORM 生成的 SQL 种类较多，放大 sqlite3 的语句缓存（默认 128）
+                'cached_statements': 256,
+            },
+        }
+    }
+
+
+# Cache
+# 配置了 REDIS_URL（Docker 部署）时使用 Redis，多个 worker 共享；否则使用进程内缓存
+# 进程内缓存的失效（cache.delete）只清当前进程，其他 worker 仍持有旧值直到 TTL 过期，
+# 因此依赖信号失效的缓存（认证用户等）在 SHARED_CACHE 为 False 时不启用
+
+SHARED_CACHE = bool(os.environ.get('REDIS_URL'))
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
 
@@ -158,7 +204,7 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework 配置
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -11,6 +11,20 @@ def pytest_configure(config):
     if not settings.configured:
         django.setup()
 
+    # 测试环境没有 broker，Celery 任务在当前进程内同步执行
+    from fundval.celery import app
+    app.conf.task_always_eager = True
+
+    # 测试不需要慢哈希，创建用户和登录用最快的哈希算法
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """每个测试前清空缓存，避免用例间互相影响"""
+    from django.core.cache import cache
+    cache.clear()
+
 
 @pytest.fixture
 def create_child_account():
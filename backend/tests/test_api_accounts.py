@@ -58,6 +58,40 @@ class TestAccountListAPI:
         assert response.status_code == 200
         assert len(response.data) == 2
 
+    def test_list_accounts_queries_independent_of_positions(self, client, user, accounts):
+        """测试账户列表查询次数与持仓数无关"""
+        from decimal import Decimal
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import Account, Fund, Position
+
+        child = Account.objects.create(user=user, name='子账户', parent=accounts[0])
+
+        def add_position(code):
+            fund = Fund.objects.create(
+                fund_code=code, fund_name=code, latest_nav=Decimal('2.0000'),
+            )
+            Position.objects.create(
+                account=child, fund=fund,
+                holding_share=Decimal('100'), holding_cost=Decimal('150'),
+                holding_nav=Decimal('1.5'),
+            )
+
+        add_position('000001')
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as first:
+            client.get('/api/accounts/')
+
+        add_position('000002')
+        add_position('000003')
+        with CaptureQueriesContext(connection) as second:
+            response = client.get('/api/accounts/')
+
+        assert len(second.captured_queries) == len(first.captured_queries)
+        parent = next(a for a in response.data if a['name'] == '账户1')
+        assert Decimal(parent['holding_value']) == Decimal('600')
+        assert Decimal(parent['holding_cost']) == Decimal('450')
+
     def test_list_accounts_unauthenticated(self, client):
         """测试未认证用户不能查看账户"""
         response = client.get('/api/accounts/')
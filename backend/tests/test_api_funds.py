@@ -55,6 +55,47 @@ class TestFundListAPI:
         assert len(response.data['results']) == 2
         assert response.data['count'] == 3
 
+    def test_list_funds_matches_serializer(self, client, funds):
+        """测试列表按字典序列化，输出与模型序列化一致"""
+        from api.models import Fund
+        from api.serializers import FundSerializer
+
+        fund = funds[0]
+        Fund.objects.filter(pk=fund.pk).update(
+            latest_nav=Decimal('1.2345'), latest_nav_date=date(2024, 2, 11)
+        )
+        fund.refresh_from_db()
+
+        response = client.get('/api/funds/?page_size=1')
+        assert response.data['results'][0] == FundSerializer(fund).data
+
+    def test_list_funds_caches_total_count(self, client, funds, settings):
+        """测试未过滤时基金总数走缓存，新增基金后失效"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import Fund
+
+        settings.SHARED_CACHE = True
+        client.get('/api/funds/?page_size=2')
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/funds/?page=2&page_size=2')
+        assert response.data['count'] == 3
+        assert not any('COUNT(' in q['sql'] for q in ctx.captured_queries)
+
+        Fund.objects.create(fund_code='000003', fund_name='基金C')
+        response = client.get('/api/funds/?page_size=2')
+        assert response.data['count'] == 4
+
+    def test_list_funds_count_not_cached_without_shared_cache(self, client, funds, settings):
+        """测试进程内缓存时不缓存基金总数（同步进程的失效清不到 web worker）"""
+        from django.core.cache import cache
+        from api.services.fund_sync import FUND_COUNT_CACHE_KEY
+
+        settings.SHARED_CACHE = False
+        response = client.get('/api/funds/?page_size=2')
+        assert response.data['count'] == 3
+        assert cache.get(FUND_COUNT_CACHE_KEY) is None
+
     def test_search_funds_by_code(self, client, funds):
         """测试按代码搜索"""
         response = client.get('/api/funds/?search=000001')
@@ -75,6 +116,18 @@ class TestFundListAPI:
         assert len(response.data['results']) == 1
         assert response.data['results'][0]['fund_code'] == '110022'
 
+    def test_list_funds_with_cursor(self, client, funds):
+        """测试按基金代码游标分页"""
+        response = client.get('/api/funds/?after=&page_size=2')
+        assert response.status_code == 200
+        assert [f['fund_code'] for f in response.data['results']] == ['000001', '000002']
+        assert response.data['next'] == '000002'
+        assert 'count' not in response.data
+
+        response = client.get(f"/api/funds/?after={response.data['next']}&page_size=2")
+        assert [f['fund_code'] for f in response.data['results']] == ['110022']
+        assert response.data['next'] is None
+
 
 @pytest.mark.django_db
 class TestFundDetailAPI:
@@ -156,6 +209,65 @@ class TestFundEstimateAPI:
         response = client.get(f'/api/funds/{fund.fund_code}/estimate/?source=eastmoney')
         assert response.status_code == 200
 
+    def test_get_fund_estimate_shares_batch_cache(self, client, fund, mocker):
+        """测试单个估值与批量估值共用缓存"""
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '000001',
+            'fund_name': '华夏成长混合',
+            'estimate_nav': Decimal('1.1370'),
+            'estimate_growth': Decimal('-1.05'),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        client.get(f'/api/funds/{fund.fund_code}/estimate/')
+        response = client.get(f'/api/funds/{fund.fund_code}/estimate/')
+        assert response.status_code == 200
+        assert response.data['estimate_nav'] == '1.1370'
+        assert response.data['fund_name'] == '华夏成长混合'
+
+        response = client.post('/api/funds/batch_estimate/', {
+            'fund_codes': [fund.fund_code]
+        }, format='json')
+        assert response.data[fund.fund_code]['from_cache'] is True
+        assert mock_source.fetch_estimate.call_count == 1
+
+    def test_get_fund_estimate_same_shape_on_hit_and_miss(self, client, fund, mocker):
+        """测试缓存命中与未命中返回一致，估值时间为数据源估值时间"""
+        from datetime import datetime
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '000001',
+            'fund_name': '华夏成长混合',
+            'estimate_nav': Decimal('1.1370'),
+            'estimate_growth': Decimal('-1.05'),
+            'estimate_time': datetime(2024, 2, 11, 15, 0),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        miss = client.get(f'/api/funds/{fund.fund_code}/estimate/')
+        hit = client.get(f'/api/funds/{fund.fund_code}/estimate/')
+
+        assert mock_source.fetch_estimate.call_count == 1
+        assert miss.json() == hit.json()
+        assert miss.json()['estimate_nav'] == '1.1370'
+        assert miss.json()['estimate_time'] == '2024-02-11T15:00:00+08:00'
+
+    def test_get_fund_estimate_cache_hit_skips_db(self, client, fund, mocker,
+                                                  django_assert_num_queries):
+        """测试估值缓存命中时不查询数据库"""
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '000001',
+            'estimate_nav': Decimal('1.1370'),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        client.get(f'/api/funds/{fund.fund_code}/estimate/')
+        with django_assert_num_queries(0):
+            response = client.get(f'/api/funds/{fund.fund_code}/estimate/')
+        assert response.data['estimate_nav'] == '1.1370'
+
 
 @pytest.mark.django_db
 class TestFundAccuracyAPI:
@@ -197,6 +309,60 @@ class TestFundAccuracyAPI:
         assert 'avg_error_rate' in response.data['eastmoney']
         assert 'record_count' in response.data['eastmoney']
 
+    def test_fund_accuracy_groups_recent_records(self, client, fund, accuracy_records):
+        """测试按数据源聚合最近 N 条记录"""
+        from api.models import EstimateAccuracy
+        EstimateAccuracy.objects.create(
+            source_name='sina',
+            fund=fund,
+            estimate_date=date(2024, 2, 20),
+            estimate_nav=Decimal('1.1000'),
+            actual_nav=Decimal('1.1100'),
+            error_rate=Decimal('0.002000'),
+        )
+
+        response = client.get(f'/api/funds/{fund.fund_code}/accuracy/?days=4')
+        assert response.status_code == 200
+        assert response.data['sina']['record_count'] == 1
+        assert response.data['sina']['avg_error_rate'] == Decimal('0.002')
+        eastmoney = response.data['eastmoney']
+        assert eastmoney['record_count'] == 3
+        assert eastmoney['avg_error_rate'] == Decimal('0.009009')
+        assert [r['date'] for r in eastmoney['records']] == [
+            date(2024, 2, 10), date(2024, 2, 9), date(2024, 2, 8),
+        ]
+
+    def test_fund_accuracy_tie_at_cutoff(self, client, fund, accuracy_records):
+        """测试截断日期上多个数据源并列时，统计与明细一致"""
+        from api.models import EstimateAccuracy
+        for source_name in ('sina', 'tiantian'):
+            EstimateAccuracy.objects.create(
+                source_name=source_name,
+                fund=fund,
+                estimate_date=date(2024, 2, 10),
+                estimate_nav=Decimal('1.1000'),
+                actual_nav=Decimal('1.1100'),
+                error_rate=Decimal('0.002000'),
+            )
+
+        # 2024-02-10 有三条记录，只取前两条：按数据源排序为 eastmoney、sina
+        response = client.get(f'/api/funds/{fund.fund_code}/accuracy/?days=2')
+        assert response.status_code == 200
+        assert set(response.data) == {'eastmoney', 'sina'}
+        for data in response.data.values():
+            assert data['record_count'] == len(data['records']) == 1
+
+    def test_fund_accuracy_query_count(self, client, fund, accuracy_records):
+        """测试准确率查询次数固定：基金 + 明细"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(f'/api/funds/{fund.fund_code}/accuracy/')
+
+        assert response.data['eastmoney']['record_count'] == 10
+        assert len(ctx.captured_queries) == 2
+
 
 @pytest.mark.django_db
 class TestBatchEstimateAPI:
@@ -219,7 +385,8 @@ class TestBatchEstimateAPI:
             latest_nav=Decimal('1.5000'),
             estimate_nav=Decimal('1.5100'),
             estimate_growth=Decimal('0.67'),
-            estimate_time=timezone.now() - timedelta(minutes=3),  # 3分钟前，缓存有效
+            estimate_time=timezone.now() - timedelta(minutes=3),
+            estimate_fetched_at=timezone.now() - timedelta(minutes=3),  # 3分钟前获取，缓存有效
         )
         fund2 = Fund.objects.create(
             fund_code='000002',
@@ -227,7 +394,8 @@ class TestBatchEstimateAPI:
             latest_nav=Decimal('2.0000'),
             estimate_nav=Decimal('2.0100'),
             estimate_growth=Decimal('0.50'),
-            estimate_time=timezone.now() - timedelta(minutes=10),  # 10分钟前，缓存失效
+            estimate_time=timezone.now() - timedelta(minutes=10),
+            estimate_fetched_at=timezone.now() - timedelta(minutes=10),  # 10分钟前获取，缓存失效
         )
         fund3 = Fund.objects.create(
             fund_code='110022',
@@ -249,6 +417,26 @@ class TestBatchEstimateAPI:
         assert Decimal(response.data['000001']['estimate_nav']) == Decimal('1.5100')
         assert Decimal(response.data['000001']['estimate_growth']) == Decimal('0.67')
 
+    def test_batch_estimate_after_hours_quote_served_from_database(self, client, funds, mocker):
+        """测试批量估值 - 收盘后报价时间早于 TTL，但刚获取过，仍用数据库估值"""
+        from datetime import datetime
+        from django.utils import timezone
+        from api.models import Fund
+        from api.viewsets import ESTIMATE_SOURCE_TZ
+
+        Fund.objects.filter(fund_code='000002').update(
+            estimate_time=datetime(2024, 2, 9, 15, 0, tzinfo=ESTIMATE_SOURCE_TZ),
+            estimate_fetched_at=timezone.now(),
+        )
+        mock_source = mocker.Mock()
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['000002']}, format='json')
+
+        mock_source.fetch_estimate.assert_not_called()
+        assert response.data['000002']['from_cache'] is True
+        assert response.data['000002']['estimate_time'] == '2024-02-09T07:00:00+00:00'
+
     def test_batch_estimate_cache_miss(self, client, funds, mocker):
         """测试批量估值 - 缓存失效，从数据源获取"""
         # Mock 数据源
@@ -390,6 +578,252 @@ class TestBatchEstimateAPI:
         assert fund.estimate_nav == Decimal('3.0300')
         assert fund.estimate_growth == Decimal('1.00')
         assert fund.estimate_time is not None
+        assert fund.estimate_fetched_at is not None
+
+    def test_batch_estimate_persists_quote_and_fetch_time(self, client, funds, mocker):
+        """测试批量估值 - 收盘后的报价：估值时间存数据源报价时间，获取时间另存"""
+        from datetime import datetime, timedelta
+        from django.utils import timezone
+        from api.models import Fund
+        from api.viewsets import ESTIMATE_SOURCE_TZ
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '110022',
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': Decimal('1.00'),
+            'estimate_time': datetime(2024, 2, 9, 15, 0),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+
+        fund = Fund.objects.get(fund_code='110022')
+        assert fund.estimate_time == datetime(2024, 2, 9, 15, 0, tzinfo=ESTIMATE_SOURCE_TZ)
+        assert timezone.now() - fund.estimate_fetched_at < timedelta(minutes=1)
+
+    def test_batch_estimate_writes_in_one_update(self, client, funds, mocker):
+        """测试批量估值 - 多个基金只发一条 UPDATE"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import Fund
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.side_effect = lambda code: {
+            'fund_code': code,
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': Decimal('1.00'),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post('/api/funds/batch_estimate/', {
+                'fund_codes': ['000002', '110022']
+            }, format='json')
+
+        assert response.status_code == 200
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        assert len(updates) == 1
+        for code in ('000002', '110022'):
+            assert Fund.objects.get(fund_code=code).estimate_nav == Decimal('3.0300')
+
+    def test_batch_estimate_persists_via_task(self, client, funds, mocker):
+        """测试批量估值 - 写库交给异步任务，请求线程不写数据库"""
+        from api.models import Fund
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '110022',
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': None,
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+        apply_async = mocker.patch('api.tasks.persist_estimates.apply_async')
+
+        from datetime import datetime, timedelta
+        from django.utils import timezone
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+
+        assert response.data['110022']['from_cache'] is False
+        rows = apply_async.call_args.kwargs['args'][0]
+        fetched_at = datetime.fromisoformat(rows[0].pop('estimate_fetched_at'))
+        assert timezone.now() - fetched_at < timedelta(minutes=1)
+        assert rows == [{
+            'fund_code': '110022',
+            'estimate_nav': '3.0300',
+            'estimate_growth': None,
+            'estimate_time': response.data['110022']['estimate_time'],
+        }]
+        assert Fund.objects.get(fund_code='110022').estimate_nav is None
+
+    def test_batch_estimate_persists_inline_without_broker(self, client, funds, mocker):
+        """测试批量估值 - 任务投递失败时同步写库"""
+        from api.models import Fund
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '110022',
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': Decimal('1.00'),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+        mocker.patch('api.tasks.persist_estimates.apply_async', side_effect=Exception('broker down'))
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+
+        assert response.status_code == 200
+        assert Fund.objects.get(fund_code='110022').estimate_nav == Decimal('3.0300')
+
+    def test_batch_estimate_served_from_cache(self, client, funds, mocker):
+        """测试批量估值 - 再次请求直接命中估值缓存，不再访问数据源"""
+        from api.models import Fund
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '110022',
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': Decimal('1.00'),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+        # 数据库中的估值被清掉，仍应命中缓存
+        Fund.objects.filter(fund_code='110022').update(estimate_nav=None, estimate_time=None)
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+
+        assert mock_source.fetch_estimate.call_count == 1
+        assert response.data['110022']['from_cache'] is True
+        assert response.data['110022']['estimate_nav'] == '3.0300'
+        assert response.data['110022']['latest_nav'] == '3.0000'
+
+    def test_batch_estimate_cache_hit_skips_database(self, client, funds, mocker):
+        """测试批量估值 - 全部命中估值缓存时不查数据库，更新净值后缓存失效"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '110022',
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': Decimal('1.00'),
+        }
+        mock_source.fetch_realtime_nav.return_value = {
+            'fund_code': '110022',
+            'nav': Decimal('3.1000'),
+            'nav_date': date(2026, 2, 11),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+        assert response.data['110022']['from_cache'] is True
+        assert len(ctx.captured_queries) == 0
+
+        client.post('/api/funds/batch_update_nav/', {'fund_codes': ['110022']}, format='json')
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+        assert response.data['110022']['latest_nav'] == '3.1000'
+
+    def test_batch_estimate_waits_for_inflight_fetch(self, client, funds, mocker):
+        """测试批量估值 - 其他请求正在获取时等待其缓存结果"""
+        from django.core.cache import cache
+        from api.viewsets import estimate_cache_key, estimate_inflight_key
+
+        cache.add(estimate_inflight_key('110022'), '1')
+        mock_source = mocker.Mock()
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        # 模拟等待期间持锁请求写入缓存
+        def fill_cache(_):
+            cache.set(estimate_cache_key('110022'), {
+                'fund_code': '110022',
+                'fund_name': '易方达消费行业',
+                'estimate_nav': '3.0300',
+                'estimate_growth': '1.00',
+                'estimate_time': '2026-02-11T14:30:00+00:00',
+                'latest_nav': '3.0000',
+                'latest_nav_date': None,
+            })
+        mocker.patch('api.viewsets.time.sleep', side_effect=fill_cache)
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+
+        mock_source.fetch_estimate.assert_not_called()
+        assert response.data['110022']['from_cache'] is True
+        assert response.data['110022']['estimate_nav'] == '3.0300'
+
+    def test_batch_estimate_stops_waiting_when_owner_gets_no_data(self, client, funds, mocker):
+        """测试批量估值 - 持锁请求未取到估值（锁已释放、无缓存）时立即自行获取"""
+        from django.core.cache import cache
+        from api.viewsets import estimate_inflight_key
+
+        cache.add(estimate_inflight_key('110022'), '1')
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = None
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        # 模拟持锁请求获取失败：不写缓存，直接释放锁
+        sleep = mocker.patch(
+            'api.viewsets.time.sleep',
+            side_effect=lambda _: cache.delete(estimate_inflight_key('110022')),
+        )
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': ['110022']}, format='json')
+
+        assert sleep.call_count == 1
+        mock_source.fetch_estimate.assert_called_once_with('110022')
+        assert response.status_code == 200
+
+    def test_batch_estimate_fetches_after_wait_timeout(self, client, funds, mocker):
+        """测试批量估值 - 等待超时后自行获取"""
+        from django.core.cache import cache
+        from api.viewsets import estimate_inflight_key
+
+        cache.add(estimate_inflight_key('110022'), '1')
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.return_value = {
+            'fund_code': '110022',
+            'estimate_nav': Decimal('3.0300'),
+            'estimate_growth': Decimal('1.00'),
+        }
+        get_source = mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+        mocker.patch('api.viewsets.ESTIMATE_WAIT_TIMEOUT', 0)
+
+        response = client.post('/api/funds/batch_estimate/', {
+            'fund_codes': ['000002', '110022']
+        }, format='json')
+
+        assert mock_source.fetch_estimate.call_count == 2
+        assert response.data['110022']['from_cache'] is False
+        # 两轮获取共用同一次数据源查找
+        get_source.assert_called_once_with('eastmoney')
+        # 他人的锁不应被释放
+        assert cache.get(estimate_inflight_key('110022')) == '1'
+
+    def test_batch_estimate_fetches_concurrently(self, client, mocker):
+        """测试批量估值 - 超过 5 个基金时并发获取，不排队等待"""
+        import threading
+        from api.models import Fund
+
+        codes = [f'{i:06d}' for i in range(10)]
+        Fund.objects.bulk_create([Fund(fund_code=c, fund_name=c) for c in codes])
+
+        # 10 个请求全部同时在途时才放行
+        barrier = threading.Barrier(len(codes), timeout=5)
+
+        def fetch_estimate(code):
+            barrier.wait()
+            return {'fund_code': code, 'estimate_nav': Decimal('1.0000'), 'estimate_growth': Decimal('0')}
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_estimate.side_effect = fetch_estimate
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        response = client.post('/api/funds/batch_estimate/', {'fund_codes': codes}, format='json')
+
+        assert all(response.data[c]['from_cache'] is False for c in codes)
 
 
 @pytest.mark.django_db
@@ -424,6 +858,28 @@ class TestSyncFundsAPI:
         assert 'created' in response.data
         assert 'updated' in response.data
 
+    def test_sync_funds_upserts_in_bulk(self, client, admin_user, mocker):
+        """测试批量同步：已存在的基金更新，新基金创建"""
+        from api.models import Fund
+
+        Fund.objects.create(fund_code='000001', fund_name='旧名称')
+        client.force_authenticate(user=admin_user)
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_fund_list.return_value = [
+            {'fund_code': '000001', 'fund_name': '华夏成长混合', 'fund_type': '混合型'},
+            {'fund_code': '000002', 'fund_name': '基金B', 'fund_type': '股票型'},
+        ]
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+
+        response = client.post('/api/funds/sync/')
+        assert response.status_code == 200
+        assert response.data['created'] == 1
+        assert response.data['updated'] == 1
+        assert response.data['total'] == 2
+        assert Fund.objects.get(fund_code='000001').fund_name == '华夏成长混合'
+        assert Fund.objects.get(fund_code='000002').fund_type == '股票型'
+
     def test_sync_funds_as_regular_user(self, client, user):
         """测试普通用户不能同步基金列表"""
         client.force_authenticate(user=user)
@@ -82,6 +82,23 @@ class TestSourceAccuracyAPI:
         # 最近5天，每天2条记录
         assert response.data['record_count'] <= 10
 
+    def test_get_source_accuracy_single_query(self, client, accuracy_records):
+        """测试准确率只用一条聚合查询"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get('/api/sources/eastmoney/accuracy/?days=5')
+
+        assert response.data['record_count'] == 5
+        assert len(ctx.captured_queries) == 1
+
+    def test_get_source_accuracy_without_records(self, client):
+        """测试没有记录时返回 0"""
+        response = client.get('/api/sources/eastmoney/accuracy/')
+        assert response.status_code == 200
+        assert response.data == {'avg_error_rate': 0, 'record_count': 0}
+
 
 @pytest.mark.django_db
 class TestUserRegisterAPI:
@@ -212,6 +229,66 @@ class TestUserSummaryAPI:
         # 持仓数：2
         assert response.data['position_count'] == 2
 
+    def test_get_user_summary_totals_aggregated(self, client, user, user_data):
+        """测试汇总由数据库一次聚合，查询次数与持仓数无关"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import Fund, Position
+
+        # 无最新净值的基金不计入市值和盈亏
+        fund3 = Fund.objects.create(fund_code='000003', fund_name='基金3')
+        Position.objects.create(
+            account=user_data['accounts'][0],
+            fund=fund3,
+            holding_share=Decimal('50'),
+            holding_cost=Decimal('500'),
+            holding_nav=Decimal('10'),
+        )
+
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/users/me/summary/')
+
+        assert response.status_code == 200
+        assert response.data['position_count'] == 3
+        assert Decimal(response.data['total_cost']) == Decimal('3500')
+        # 1.5 × 100 + 2.0 × 200
+        assert Decimal(response.data['total_value']) == Decimal('550')
+        # (1.5 - 10) × 100 + (2.0 - 10) × 200
+        assert Decimal(response.data['total_pnl']) == Decimal('-2450')
+        # 账户数和持仓汇总在同一条查询中
+        assert len(context.captured_queries) == 1
+
+    def test_get_user_summary_cached_until_position_change(self, client, user, user_data, settings,
+                                                           django_assert_num_queries):
+        """测试汇总缓存命中不查库，持仓变化后失效"""
+        from api.models import Position
+
+        settings.SHARED_CACHE = True
+        client.force_authenticate(user=user)
+        client.get('/api/users/me/summary/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/users/me/summary/')
+        assert Decimal(response.data['total_cost']) == Decimal('3000')
+
+        position = Position.objects.get(account=user_data['accounts'][0])
+        position.holding_cost = Decimal('1500')
+        position.save()
+
+        response = client.get('/api/users/me/summary/')
+        assert Decimal(response.data['total_cost']) == Decimal('3500')
+
+    def test_get_user_summary_not_cached_without_shared_cache(self, client, user, user_data, settings):
+        """测试进程内缓存时不缓存汇总（失效清不到其他 worker）"""
+        from django.core.cache import cache
+        from api.services.summary_cache import user_summary_cache_key
+
+        settings.SHARED_CACHE = False
+        client.force_authenticate(user=user)
+        response = client.get('/api/users/me/summary/')
+        assert response.status_code == 200
+        assert cache.get(user_summary_cache_key(user.id)) is None
+
     def test_get_user_summary_unauthenticated(self, client):
         """测试未认证用户不能查看汇总"""
         response = client.get('/api/users/me/summary/')
@@ -8,6 +8,8 @@
 4. 查询父账户，返回 400
 5. 自定义天数，返回正确数量
 6. 未认证用户，返回 401
+7. 结果缓存，流水变化后失效
+8. 批量更新净值后缓存失效
 """
 import pytest
 from decimal import Decimal
@@ -229,3 +231,68 @@ class TestPositionHistoryAPI:
         )
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_position_history_cached_until_operations_change(self, auth_client, child_account, fund):
+        """结果缓存，新增流水后重新计算"""
+        from unittest.mock import patch
+        from api.models import PositionOperation
+        from api.services import position_history
+
+        def buy(amount):
+            PositionOperation.objects.create(
+                account=child_account,
+                fund=fund,
+                operation_type='BUY',
+                operation_date=date.today() - timedelta(days=3),
+                amount=Decimal(amount),
+                share=Decimal(amount),
+                nav=Decimal('1.0000'),
+                before_15=True
+            )
+
+        buy('1000.00')
+        params = {'account_id': str(child_account.id), 'days': 5}
+
+        with patch.object(
+            position_history, 'calculate_account_history',
+            wraps=position_history.calculate_account_history
+        ) as mock_calc:
+            first = auth_client.get('/api/positions/history/', params).json()
+            second = auth_client.get('/api/positions/history/', params).json()
+            assert mock_calc.call_count == 1
+            assert first == second
+
+            buy('500.00')
+            third = auth_client.get('/api/positions/history/', params).json()
+            assert mock_calc.call_count == 2
+            assert third[-1]['cost'] == 1500.0
+
+    def test_position_history_refreshed_after_batch_update_nav(self, auth_client, child_account, fund, mocker):
+        """批量更新净值后重新计算（无历史净值时以最新净值估算市值）"""
+        from api.models import PositionOperation
+
+        PositionOperation.objects.create(
+            account=child_account,
+            fund=fund,
+            operation_type='BUY',
+            operation_date=date.today() - timedelta(days=3),
+            amount=Decimal('1000.00'),
+            share=Decimal('1000.00'),
+            nav=Decimal('1.0000'),
+            before_15=True
+        )
+        params = {'account_id': str(child_account.id), 'days': 5}
+        before = auth_client.get('/api/positions/history/', params).json()
+        assert before[-1]['value'] == 1500.0
+
+        mock_source = mocker.Mock()
+        mock_source.fetch_realtime_nav.return_value = {
+            'fund_code': '000001',
+            'nav': Decimal('1.8000'),
+            'nav_date': date.today(),
+        }
+        mocker.patch('api.sources.SourceRegistry.get_source', return_value=mock_source)
+        auth_client.post('/api/funds/batch_update_nav/', {'fund_codes': ['000001']}, format='json')
+
+        after = auth_client.get('/api/positions/history/', params).json()
+        assert after[-1]['value'] == 1800.0
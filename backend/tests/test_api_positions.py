@@ -62,6 +62,19 @@ class TestPositionListAPI:
         assert response.status_code == 200
         assert len(response.data) == 2
 
+    def test_list_positions_single_query(self, client, user, positions):
+        """测试持仓列表一条查询取回所有序列化字段（不触发延迟加载）"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/positions/')
+
+        assert {p['account_name'] for p in response.data} == {'我的账户'}
+        assert {p['fund']['fund_code'] for p in response.data} == {'000001', '000002'}
+        assert len(context.captured_queries) == 1
+
     def test_filter_positions_by_account(self, client, user, account, positions):
         """测试按账户过滤持仓"""
         client.force_authenticate(user=user)
@@ -246,6 +259,36 @@ class TestPositionOperationListAPI:
         assert response.status_code == 200
         assert len(response.data) == 2
 
+    def test_list_operations_query_count_independent_of_rows(self, client, user, operations):
+        """测试操作流水列表查询次数不随流水数量增长"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import Fund, PositionOperation
+
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/positions/operations/')
+        baseline = len(context.captured_queries)
+
+        account = operations[0].account
+        for i in range(3):
+            fund = Fund.objects.create(fund_code=f'10000{i}', fund_name=f'基金{i}')
+            PositionOperation.objects.create(
+                account=account,
+                fund=fund,
+                operation_type='BUY',
+                operation_date=date(2024, 2, 13),
+                amount=Decimal('100'),
+                share=Decimal('10'),
+                nav=Decimal('10'),
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/positions/operations/')
+
+        assert len(response.data) == 5
+        assert len(context.captured_queries) == baseline
+
     def test_filter_operations_by_account(self, client, user, operations):
         """测试按账户过滤操作"""
         account_id = operations[0].account.id
@@ -45,6 +45,34 @@ class TestWatchlistListAPI:
         assert response.status_code == 200
         assert len(response.data) == 2
 
+    def test_list_watchlists_query_count_independent_of_items(self, client, user, watchlists):
+        """测试自选列表查询次数不随列表项数量增长"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import Fund, WatchlistItem
+
+        client.force_authenticate(user=user)
+
+        def add_items(start, count):
+            for i in range(start, start + count):
+                fund = Fund.objects.create(fund_code=f'{i:06d}', fund_name=f'基金{i}')
+                for watchlist in watchlists:
+                    WatchlistItem.objects.create(watchlist=watchlist, fund=fund, order=i)
+
+        add_items(1, 1)
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/watchlists/')
+        baseline = len(context.captured_queries)
+
+        add_items(2, 5)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/watchlists/')
+
+        assert response.status_code == 200
+        assert [len(w['items']) for w in response.data] == [6, 6]
+        assert response.data[0]['items'][-1]['fund_code'] == '000006'
+        assert len(context.captured_queries) == baseline
+
     def test_list_watchlists_unauthenticated(self, client):
         """测试未认证用户不能查看自选"""
         response = client.get('/api/watchlists/')
@@ -214,6 +242,36 @@ class TestWatchlistItemsAPI:
             fund=fund
         ).exists()
 
+    def test_add_fund_appends_order(self, client, user, watchlist, fund):
+        """测试添加基金时 order 依次递增（包括已有 order 为 0 的情况）"""
+        from api.models import Fund, WatchlistItem
+        fund2 = Fund.objects.create(fund_code='000002', fund_name='基金B')
+
+        client.force_authenticate(user=user)
+        client.post(f'/api/watchlists/{watchlist.id}/items/', {'fund_code': fund.fund_code})
+        client.post(f'/api/watchlists/{watchlist.id}/items/', {'fund_code': fund2.fund_code})
+
+        orders = dict(WatchlistItem.objects.filter(
+            watchlist=watchlist
+        ).values_list('fund__fund_code', 'order'))
+        assert orders == {'000001': 0, '000002': 1}
+
+    def test_add_fund_single_item_query(self, client, user, watchlist, fund):
+        """测试添加基金时自选项表只有一条 INSERT"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.post(f'/api/watchlists/{watchlist.id}/items/', {
+                'fund_code': fund.fund_code,
+            })
+
+        assert response.status_code == 201
+        item_queries = [q['sql'] for q in ctx.captured_queries if '"watchlist_item"' in q['sql']]
+        assert len(item_queries) == 1
+        assert item_queries[0].startswith('INSERT INTO "watchlist_item"')
+
     def test_add_duplicate_fund(self, client, user, watchlist, fund):
         """测试添加重复基金"""
         from api.models import WatchlistItem
@@ -288,3 +346,24 @@ class TestWatchlistReorderAPI:
         assert items[1].fund.fund_code == '000001'
         assert items[2].order == 2
         assert items[2].fund.fund_code == '000002'
+
+    def test_reorder_ignores_unknown_codes_with_fixed_queries(self, client, user, watchlist_with_items):
+        """测试重新排序忽略不存在的基金，查询次数与列表长度无关"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import WatchlistItem
+
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.put(f'/api/watchlists/{watchlist_with_items.id}/reorder/', {
+                'fund_codes': ['000002', '999999', '000003', '000001'],
+            }, format='json')
+        assert response.status_code == 200
+
+        orders = dict(WatchlistItem.objects.filter(
+            watchlist=watchlist_with_items
+        ).values_list('fund__fund_code', 'order'))
+        assert orders == {'000002': 0, '000003': 2, '000001': 3}
+
+        # 认证/取列表 + 查询列表项 + 批量更新（含事务语句），不随基金数量增长
+        assert len(context.captured_queries) <= 6
@@ -7,6 +7,7 @@
 3. 获取当前用户信息
 4. 修改密码
 5. 角色权限（admin/user）
+6. 认证用户缓存
 """
 import pytest
 from django.test import Client
@@ -148,6 +149,45 @@ class TestAuth:
         assert new_login.status_code == 200
 
 
+    def test_authenticated_user_cached(self, settings, django_assert_num_queries):
+        """测试认证用户走缓存，禁用后立即失效"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        settings.SHARED_CACHE = True
+
+        User = get_user_model()
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        access_token = str(RefreshToken.for_user(user).access_token)
+
+        client = Client()
+        client.get('/api/auth/me', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        with django_assert_num_queries(0):
+            response = client.get('/api/auth/me', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        assert response.status_code == 200
+
+        user.is_active = False
+        user.save()
+
+        response = client.get('/api/auth/me', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        assert response.status_code == 401
+
+    def test_authenticated_user_not_cached_without_shared_cache(self, settings):
+        """测试进程内缓存时不缓存认证用户（失效清不到其他 worker）"""
+        from django.core.cache import cache
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from api.authentication import auth_user_cache_key
+
+        settings.SHARED_CACHE = False
+        User = get_user_model()
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        access_token = str(RefreshToken.for_user(user).access_token)
+
+        client = Client()
+        response = client.get('/api/auth/me', HTTP_AUTHORIZATION=f'Bearer {access_token}')
+        assert response.status_code == 200
+        assert cache.get(auth_user_cache_key(user.id)) is None
+
+
 @pytest.mark.django_db
 class TestUserRoles:
     """用户角色测试"""
@@ -95,6 +95,29 @@ class TestAccountQueryOptimization:
         query_count = len(context.captured_queries)
         assert query_count <= 10, f"查询次数过多: {query_count} 次"
 
+    def test_account_list_query_count_independent_of_children(self, user, setup_accounts_with_positions):
+        """测试：账户列表查询次数不随子账户数量增长"""
+        from django.test.utils import CaptureQueriesContext
+
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/accounts/')
+        baseline = len(context.captured_queries)
+
+        # 再增加 3 个子账户
+        parent = setup_accounts_with_positions['parent']
+        for i in range(3):
+            Account.objects.create(user=user, name=f'新增子账户{i+1}', parent=parent)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/accounts/')
+
+        assert response.status_code == 200
+        assert len(response.data) == 7
+        assert len(context.captured_queries) == baseline
+
     def test_account_detail_with_children_query_count(self, user, setup_accounts_with_positions):
         """测试：父账户详情查询次数应该被优化"""
         from django.test.utils import CaptureQueriesContext
@@ -10,6 +10,7 @@
 6. 边界情况（卖出超过持有、负数等）
 7. 盈亏计算
 8. 批量重算
+9. 重算保存持仓时不额外查询账户
 """
 import pytest
 from decimal import Decimal
@@ -483,3 +484,28 @@ class TestBatchRecalculation:
         # 现在两个账户都应该有持仓
         assert Position.objects.filter(account=account1).count() == 1
         assert Position.objects.filter(account=account2).count() == 1
+
+    def test_recalculate_position_no_extra_account_query(self, account, fund1):
+        """测试重算保存持仓时，清除汇总缓存不再单独查询账户"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import PositionOperation
+        from api.services import recalculate_position
+
+        PositionOperation.objects.create(
+            account=account,
+            fund=fund1,
+            operation_type='BUY',
+            operation_date=date(2024, 2, 11),
+            amount=Decimal('1000'),
+            share=Decimal('100'),
+            nav=Decimal('10'),
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            recalculate_position(account.id, fund1.id)
+
+        assert not [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT "account"."user_id"')
+        ]
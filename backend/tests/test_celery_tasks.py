@@ -71,6 +71,41 @@ class TestUpdateFundNavTask:
                 assert '测试错误' in call_args
 
 
+@pytest.mark.django_db
+class TestPersistEstimatesTask:
+    """测试估值持久化任务"""
+
+    def test_persist_estimates_bulk_updates(self):
+        """测试批量写入估值，忽略不存在的基金"""
+        from datetime import datetime, timezone
+        from decimal import Decimal
+        from api.models import Fund
+        from api.tasks import persist_estimates
+
+        Fund.objects.create(fund_code='000001', fund_name='基金A')
+        Fund.objects.create(fund_code='000002', fund_name='基金B')
+
+        count = persist_estimates([
+            {'fund_code': '000001', 'estimate_nav': '1.2345', 'estimate_growth': '0.50',
+             'estimate_time': '2026-02-11T14:30:00+00:00',
+             'estimate_fetched_at': '2026-02-11T14:31:00+00:00'},
+            {'fund_code': '000002', 'estimate_nav': '2.0000', 'estimate_growth': None,
+             'estimate_time': '2026-02-11T14:30:00+00:00'},
+            {'fund_code': '999999', 'estimate_nav': '1.0000', 'estimate_growth': None,
+             'estimate_time': '2026-02-11T14:30:00+00:00'},
+        ])
+
+        assert count == 2
+        fund = Fund.objects.get(fund_code='000001')
+        assert fund.estimate_nav == Decimal('1.2345')
+        assert fund.estimate_growth == Decimal('0.50')
+        assert fund.estimate_time == datetime(2026, 2, 11, 14, 30, tzinfo=timezone.utc)
+        assert fund.estimate_fetched_at == datetime(2026, 2, 11, 14, 31, tzinfo=timezone.utc)
+        fund = Fund.objects.get(fund_code='000002')
+        assert fund.estimate_growth is None
+        assert fund.estimate_fetched_at is None
+
+
 @pytest.mark.django_db
 class TestCeleryConfiguration:
     """测试 Celery 配置"""
@@ -65,6 +65,31 @@ class TestSyncFundsCommand:
         assert fund.fund_name == '华夏成长混合'
         assert fund.fund_type == '混合型-灵活'
 
+    @patch('api.sources.eastmoney.requests.get')
+    def test_sync_funds_bulk_counts_and_duplicates(self, mock_get):
+        """测试批量同步：统计新增/更新数，重复代码只保留最后一条"""
+        from api.models import Fund
+
+        Fund.objects.create(fund_code='000001', fund_name='旧名称')
+
+        mock_response = Mock()
+        mock_response.text = (
+            'var r = [["000001","A","华夏成长混合","混合型","A"],'
+            '["000002","B","基金B","股票型","B"],'
+            '["000002","B","基金B(新)","股票型","B"]];'
+        )
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        out = StringIO()
+        with patch('api.management.commands.sync_funds.BATCH_SIZE', 1):
+            call_command('sync_funds', stdout=out)
+
+        assert '新增 1 个，更新 1 个' in out.getvalue()
+        assert Fund.objects.count() == 2
+        assert Fund.objects.get(fund_code='000001').fund_name == '华夏成长混合'
+        assert Fund.objects.get(fund_code='000002').fund_name == '基金B(新)'
+
     @patch('api.sources.eastmoney.requests.get')
     def test_sync_funds_api_error(self, mock_get):
         """测试 API 错误处理"""
@@ -123,6 +148,45 @@ class TestUpdateNavCommand:
         fund.refresh_from_db()
         assert fund.latest_nav == Decimal('1.1490')
 
+    @patch('api.sources.eastmoney.requests.get')
+    def test_update_nav_batches_writes(self, mock_get, fund):
+        """测试净值按批写入，批次边界之外的基金也会更新"""
+        from api.models import Fund
+
+        fund2 = Fund.objects.create(fund_code='000002', fund_name='基金B')
+
+        mock_response = Mock()
+        mock_response.text = 'jsonpgz({"fundcode":"000001","jzrq":"2026-02-10","dwjz":"1.1490"});'
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        out = StringIO()
+        with patch('api.management.commands.update_nav.BATCH_SIZE', 1):
+            call_command('update_nav', stdout=out)
+
+        assert '成功 2 个' in out.getvalue()
+        for f in (fund, fund2):
+            f.refresh_from_db()
+            assert f.latest_nav == Decimal('1.1490')
+            assert f.latest_nav_date == date(2026, 2, 10)
+
+    @patch('api.sources.eastmoney.requests.get')
+    def test_update_nav_invalidates_estimate_cache(self, mock_get, fund):
+        """测试更新净值后清除带旧净值的估值缓存"""
+        from django.core.cache import cache
+        from api.services.estimate_cache import estimate_cache_key
+
+        cache.set(estimate_cache_key('000001'), {'latest_nav': '1.0000'})
+
+        mock_response = Mock()
+        mock_response.text = 'jsonpgz({"fundcode":"000001","jzrq":"2026-02-10","dwjz":"1.1490"});'
+        mock_response.status_code = 200
+        mock_get.return_value = mock_response
+
+        call_command('update_nav', stdout=StringIO())
+
+        assert cache.get(estimate_cache_key('000001')) is None
+
     @patch('api.sources.eastmoney.requests.get')
     def test_update_nav_api_error(self, mock_get, fund):
         """测试 API 错误时继续处理其他基金"""
@@ -161,6 +161,25 @@ class TestFundNavHistoryAPI:
         assert len(response.data['000001']) == 5
         assert len(response.data['000002']) == 1
 
+    def test_batch_query_single_query(self, client, nav_history,
+                                      django_assert_num_queries):
+        """测试批量查询只执行一次 SQL"""
+        fund2 = Fund.objects.create(fund_code='000002', fund_name='基金2')
+        FundNavHistory.objects.create(
+            fund=fund2,
+            nav_date=date(2024, 1, 1),
+            unit_nav=Decimal('3.0000'),
+        )
+
+        with django_assert_num_queries(1):
+            response = client.post('/api/nav-history/batch_query/', {
+                'fund_codes': ['000001', '000002'],
+            }, format='json')
+
+        assert response.data['000002'][0]['fund_name'] == '基金2'
+        dates = [item['nav_date'] for item in response.data['000001']]
+        assert dates == sorted(dates, reverse=True)
+
     def test_batch_query_with_date_range(self, client, nav_history):
         """测试批量查询指定日期范围"""
         response = client.post('/api/nav-history/batch_query/', {
@@ -284,3 +284,72 @@ class TestPositionHistory:
 
         result_7 = calculate_account_history(account.id, days=7)
         assert len(result_7) == 8  # 7 天 + 今天
+
+    def test_calculate_account_history_query_count(self, account, fund1, fund2):
+        """流水只查询一次，净值一次，共 2 条 SQL"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import PositionOperation
+        from api.services.position_history import calculate_account_history
+
+        for fund in (fund1, fund2):
+            PositionOperation.objects.create(
+                account=account,
+                fund=fund,
+                operation_type='BUY',
+                operation_date=date.today() - timedelta(days=5),
+                amount=Decimal('1000.00'),
+                share=Decimal('1000.0000'),
+                nav=Decimal('1.0000'),
+                before_15=True
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            calculate_account_history(account.id, days=10)
+
+        assert len(context.captured_queries) == 2
+
+    def test_calculate_account_history_sell_cost_rounding(self, account, fund1):
+        """卖出后成本舍入到分，与 Position.holding_cost 一致"""
+        from api.models import PositionOperation, Position
+        from api.services.position_history import calculate_account_history
+
+        buy_date = date.today() - timedelta(days=5)
+        PositionOperation.objects.create(
+            account=account, fund=fund1, operation_type='BUY',
+            operation_date=buy_date, amount=Decimal('1000.00'),
+            share=Decimal('300.0000'), nav=Decimal('3.3333'), before_15=True
+        )
+        PositionOperation.objects.create(
+            account=account, fund=fund1, operation_type='SELL',
+            operation_date=buy_date + timedelta(days=1), amount=Decimal('0'),
+            share=Decimal('100.0000'), nav=Decimal('3.3333'), before_15=True
+        )
+
+        result = calculate_account_history(account.id, days=5)
+        position = Position.objects.get(account=account, fund=fund1)
+
+        assert position.holding_cost == Decimal('666.67')
+        assert result[-1]['cost'] == float(position.holding_cost)
+
+    def test_calculate_account_history_forward_fills_nav_gaps(self, account, fund1):
+        """非交易日沿用最近一个净值，而不是 Fund.latest_nav"""
+        from api.models import PositionOperation, FundNavHistory
+        from api.services.position_history import calculate_account_history
+
+        today = date.today()
+        PositionOperation.objects.create(
+            account=account, fund=fund1, operation_type='BUY',
+            operation_date=today - timedelta(days=10), amount=Decimal('1000.00'),
+            share=Decimal('1000.0000'), nav=Decimal('1.0000'), before_15=True
+        )
+        for offset, nav in [(6, '1.0500'), (4, '1.1000'), (2, '1.2000')]:
+            FundNavHistory.objects.create(
+                fund=fund1, nav_date=today - timedelta(days=offset), unit_nav=Decimal(nav)
+            )
+
+        result = calculate_account_history(account.id, days=5)
+
+        values = [round(r['value'], 2) for r in result]
+        # 区间首日取区间前最近净值 1.05；缺失日期沿用前一个净值
+        assert values == [1050.0, 1100.0, 1100.0, 1200.0, 1200.0, 1200.0]
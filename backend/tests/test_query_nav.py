@@ -8,12 +8,16 @@
 4. 未来日期应返回 400
 5. 历史净值不存在时应 fallback 到 Fund.latest_nav
 6. 历史净值和 latest_nav 都不存在应返回 404
+7. 历史净值不存在时从数据源同步
 """
 import pytest
 from decimal import Decimal
 from datetime import date
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import patch, MagicMock
 
 from api.models import Fund, FundNavHistory
 
@@ -125,6 +129,33 @@ class TestQueryNav:
         assert response.status_code == 400
         assert 'operation_date' in response.data
 
+    def test_query_nav_synced(self, client, fund):
+        """历史净值不存在时从数据源同步，直接返回同步的记录"""
+        mock_source = MagicMock()
+        mock_source.fetch_nav_history.return_value = [{
+            'nav_date': date(2024, 1, 2),
+            'unit_nav': Decimal('1.2345'),
+        }]
+
+        with patch('api.services.nav_history.SourceRegistry.get_source', return_value=mock_source):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post('/api/funds/query_nav/', {
+                    'fund_code': '000001',
+                    'operation_date': '2024-01-03',
+                    'before_15': True,
+                }, format='json')
+
+        # 首次查询和 update_or_create 各一次，同步后不再查询
+        selects = [
+            q['sql'] for q in context.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "fund_nav_history"' in q['sql']
+        ]
+        assert len(selects) == 2
+        assert response.status_code == 200
+        assert Decimal(response.data['nav']) == Decimal('1.2345')
+        assert response.data['nav_date'] == '2024-01-02'
+        assert response.data['source'] == 'synced'
+
     def test_query_nav_fallback_to_latest(self, client, fund):
         """历史净值不存在时应 fallback 到 Fund.latest_nav"""
         # 查询一个没有历史净值的日期
@@ -293,7 +293,7 @@ class TestPositionSerializerGetFund:
 
         # 验证估值信息
         assert fund_data['estimate_nav'] == '1.6000'
-        assert fund_data['estimate_growth'] == '6.67'
+        assert fund_data['estimate_growth'] == '6.6700'  # 按字段精度输出 4 位小数
         assert fund_data['estimate_time'] is not None
 
     def test_get_fund_without_estimate(self, account, fund_without_estimate):
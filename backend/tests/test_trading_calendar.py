@@ -9,6 +9,7 @@
 """
 import pytest
 from datetime import date, timedelta
+import chinese_calendar
 from api.utils.trading_calendar import is_trading_day, get_last_trading_day
 
 
@@ -68,3 +69,10 @@ class TestTradingCalendar:
         """长假期间应该能正确往前找"""
         # 2024-02-12 是春节假期（2月10-17日），应该返回 2024-02-09（周五）
         assert get_last_trading_day(date(2024, 2, 12)) == date(2024, 2, 9)
+
+    def test_is_trading_day_matches_calendar_for_whole_year(self):
+        """按年预计算的结果应与 chinese_calendar 逐日判断一致"""
+        d = date(2024, 1, 1)
+        while d.year == 2024:
+            assert is_trading_day(d) is chinese_calendar.is_workday(d)
+            d += timedelta(days=1)
@@ -0,0 +1,34 @@
+"""
+测试 UUIDv7 生成
+
+测试点：
+1. 版本号与变体
+2. 按时间递增
+"""
+import time
+import uuid
+from api.utils.uuid7 import uuid7
+
+
+class TestUUID7:
+    """UUIDv7 测试"""
+
+    def test_version_and_variant(self):
+        """版本号为 7，变体为 RFC 4122"""
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_embeds_timestamp(self):
+        """前 48 位为毫秒时间戳"""
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        assert before <= value.int >> 80 <= after
+
+    def test_sorted_by_time(self):
+        """不同毫秒生成的 UUID 按时间递增"""
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        assert first < second
@@ -101,6 +101,7 @@ class TestFundBatchEstimate:
         fund1.estimate_nav = Decimal('1.6000')
         fund1.estimate_growth = Decimal('6.67')
         fund1.estimate_time = timezone.now()
+        fund1.estimate_fetched_at = timezone.now()
         fund1.save()
 
         # 调用 API
@@ -122,6 +123,7 @@ class TestFundBatchEstimate:
         fund1.estimate_nav = Decimal('1.5000')
         fund1.estimate_growth = Decimal('0.00')
         fund1.estimate_time = timezone.now() - timezone.timedelta(minutes=6)
+        fund1.estimate_fetched_at = timezone.now() - timezone.timedelta(minutes=6)
         fund1.save()
 
         with patch('api.viewsets.SourceRegistry.get_source') as mock_get_source:
@@ -235,6 +237,32 @@ class TestFundBatchUpdateNav:
             assert fund1.latest_nav == Decimal('1.5000')
             assert fund1.latest_nav_date == date(2026, 2, 11)
 
+    def test_batch_update_nav_writes_in_one_update(self, client, funds):
+        """测试：多个基金的净值用一条 UPDATE 写回"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with patch('api.viewsets.SourceRegistry.get_source') as mock_get_source:
+            mock_source = MagicMock()
+            mock_source.fetch_realtime_nav.side_effect = lambda code: {
+                'fund_code': code,
+                'nav': Decimal('1.5000'),
+                'nav_date': date(2026, 2, 11),
+            }
+            mock_get_source.return_value = mock_source
+
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.post('/api/funds/batch_update_nav/', {
+                    'fund_codes': ['000001', '000002']
+                }, format='json')
+
+        assert response.status_code == 200
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        assert len(updates) == 1
+        for fund in funds:
+            fund.refresh_from_db()
+            assert fund.latest_nav == Decimal('1.5000')
+
     def test_batch_update_nav_with_error(self, client, funds):
         """测试：获取净值失败时，返回错误"""
         with patch('api.viewsets.SourceRegistry.get_source') as mock_get_source:
@@ -437,3 +465,24 @@ class TestPositionOperationAPIWithRecalculation:
         position = Position.objects.get(account=account, fund=fund)
         assert position.holding_share == Decimal('150')
         assert position.holding_cost == Decimal('1500')
+
+    def test_create_operation_recalculates_once(self, client, user, account, fund):
+        """测试：创建操作只重算一次持仓（由 PositionOperation.save 负责）"""
+        from api.services import recalculate_position
+
+        client.force_authenticate(user=user)
+
+        with patch('api.services.recalculate_position', wraps=recalculate_position) as mock_recalc:
+            response = client.post('/api/positions/operations/', {
+                'account': str(account.id),
+                'fund_code': '000001',
+                'operation_type': 'BUY',
+                'operation_date': date.today().isoformat(),
+                'before_15': True,
+                'amount': '1000.00',
+                'share': '100.0000',
+                'nav': '10.0000',
+            }, format='json')
+
+        assert response.status_code == 201
+        mock_recalc.assert_called_once_with(account.id, fund.id)